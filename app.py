@@ -1,27 +1,81 @@
 # app.py (FINAL, STABLE, UPLOAD-ONLY VERSION)
 
 import gradio as gr
+import io
 import os
-import shutil
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
 
-# Importing custom modules
-from src.audio_processor import AudioProcessor
-from src.transcriber import Transcriber
+# Importing custom modules. The model classes are cheap to import; the heavy
+# ML libraries are only loaded when a model is first built.
+from src.audio_processor import AudioProcessor, SAMPLE_RATE
+from src.transcriber import Transcriber, DECODE_OPTIONS
 from src.translator import Translator
-from src.subtitle_generator import SubtitleGenerator
-from src.analyzer import Analyzer
+from src.translation_cache import TranslationCache
+from src.transcript_cache import TranscriptCache
+from src.transcript_timing import TranscriptTiming
+from src.subtitle_generator import SubtitleGenerator, SUBTITLE_FORMATS
+from src.resegmenter import Resegmenter
+from src.model_registry import ModelRegistry
+from src.job_scheduler import JobScheduler
+from src.metrics import JobMetrics, MetricsCollector
+
+# --- 1. REGISTER MODELS; EACH ONE LOADS ON FIRST USE ---
+PRELOAD_MODELS = ["transcriber"]      # Loaded in the background at startup
+MODEL_IDLE_TTL_SECONDS = 30 * 60      # Unload models nobody has used for this long
+WHISPER_MODEL_SIZE = "base"
+# Word alignment costs extra decoder work per window; it only feeds the speaking-rate line.
+# The VAD speech map is kept with each transcript either way.
+WHISPER_WORD_TIMESTAMPS = False
+# "torch" (fp32), "torch-int8" (dynamic quantization) or "ctranslate2" (int8, converted
+# on first use). Can be overridden with the TRANSLATOR_BACKEND environment variable.
+TRANSLATOR_BACKEND = os.environ.get("TRANSLATOR_BACKEND", "torch")
+TRANSLATOR_BEAM_SIZE = None           # None keeps mBART-50's 5 beams; 1 is greedy (fastest)
+
+# --- JOB SCHEDULING ---
+# Per-stage concurrency limits. Translation stays at 1 because the shared tokenizer's
+# source language is per-instance state. The CPU thread budget is split between the
+# Whisper and mBART stages so concurrent jobs don't oversubscribe the cores.
+STAGE_LIMITS = {"audio": 2, "whisper": 1, "translate": 1}
+COMPUTE_WEIGHTS = {"whisper": 1, "translate": 1}
+JOB_CONCURRENCY = 3                   # Jobs in flight at once, so their stages can overlap
+MAX_QUEUED_JOBS = 20                  # Further requests are rejected by Gradio's queue
+TRANSLATION_MICRO_BATCH = 16          # Whisper segments per batch, merged into fewer, even-sized units
+PREVIEW_INTERVAL_SECONDS = 2.0        # How often the live transcript preview is pushed to the browser
+JOB_OUTPUT_TTL_SECONDS = 60 * 60      # Subtitle folders of finished jobs are deleted after this long
+
+# --- METRICS ---
+METRICS_DIR = "metrics"               # Per-job JSON logs (and cProfile dumps when requested)
+PROMETHEUS_FILE = os.path.join(METRICS_DIR, "metrics.prom")
+
+def _build_analyzer():
+    from src.analyzer import Analyzer
+    return Analyzer()
 
-# --- 1. INITIALIZE ALL MODELS ONCE ON STARTUP ---
-print("Initializing all models, please wait...")
 audio_processor = AudioProcessor()
-transcriber = Transcriber(model_size="base")
-translator = Translator()
 subtitle_generator = SubtitleGenerator()
-analyzer = Analyzer()
-print("\nAll models initialized. The application is ready.")
+resegmenter = Resegmenter()
+metrics_collector = MetricsCollector(prometheus_path=PROMETHEUS_FILE)
+transcript_cache = TranscriptCache()
+scheduler = JobScheduler(STAGE_LIMITS, compute_weights=COMPUTE_WEIGHTS)
+models = ModelRegistry(idle_ttl_seconds=MODEL_IDLE_TTL_SECONDS)
+models.register("transcriber", lambda: Transcriber(
+    model_size=WHISPER_MODEL_SIZE, cpu_threads=scheduler.threads_per_worker("whisper"), word_timestamps=WHISPER_WORD_TIMESTAMPS
+))
+models.register("translator", lambda: Translator(
+    cache=TranslationCache(), num_threads=scheduler.threads_per_worker("translate"),
+    backend=TRANSLATOR_BACKEND, beam_size=TRANSLATOR_BEAM_SIZE
+))
+models.register("analyzer", _build_analyzer)
+models.preload(PRELOAD_MODELS)
+print("The application is ready. Models load on first use.")
 
 # --- USAGE COUNTER ---
 COUNTER_FILE = "usage_count.txt"
+_counter_lock = threading.Lock()
 def get_usage_count():
     if not os.path.exists(COUNTER_FILE): return 0
     with open(COUNTER_FILE, "r") as f:
@@ -29,54 +83,220 @@ def get_usage_count():
         except (ValueError, TypeError): return 0
 
 def increment_usage_count():
-    count = get_usage_count() + 1
-    with open(COUNTER_FILE, "w") as f: f.write(str(count))
+    # Concurrent jobs finish on different threads: serialize the read-modify-write and
+    # replace the file atomically so a reader never sees it half-written.
+    with _counter_lock:
+        count = get_usage_count() + 1
+        tmp_path = f"{COUNTER_FILE}.tmp"
+        with open(tmp_path, "w") as f: f.write(str(count))
+        os.replace(tmp_path, COUNTER_FILE)
     return count
 
+# --- PIPELINE STAGES (run on the scheduler's per-stage pools) ---
+_END_OF_STREAM = object()
+
+def _prepare_audio(job_metrics, video_upload_path, apply_noise_reduction, duration_limit):
+    """Audio stage: decodes (and optionally denoises) the upload into a 16 kHz array."""
+    with job_metrics.stage("audio") as stage:
+        # Audio is decoded and denoised in memory and handed to Whisper as an array.
+        # Full-length runs are denoised chunk by chunk so long uploads don't get STFT'd in one go.
+        if duration_limit is None:
+            processed_audio = audio_processor.process_video_or_audio_streaming_to_array(video_upload_path, apply_noise_reduction)
+        else:
+            processed_audio = audio_processor.process_video_or_audio_to_array(video_upload_path, apply_noise_reduction, duration_limit)
+        stage.add(audio_seconds=processed_audio.size / SAMPLE_RATE)
+    return processed_audio
+
+def _transcribe_to_queue(job_metrics, transcriber, processed_audio, segment_queue, cancelled, timing, transcript_key):
+    """
+    Whisper stage: puts the detected language, then each decoded segment, onto the job's queue.
+    The VAD speech map and word timestamps are collected into `timing` along the way.
+
+    A complete transcript is cached here, as soon as decoding ends, so it survives a
+    later failure or cancellation in translation.
+    """
+    try:
+        with job_metrics.stage("transcribe") as stage:
+            segment_stream, src_lang = transcriber.stream_segments(processed_audio, timing=timing)
+            segment_queue.put(src_lang)
+            segments = []
+            for segment in segment_stream:
+                if cancelled.is_set():
+                    return
+                segments.append(segment)
+                segment_queue.put(segment)
+                stage.add(segments=1)
+            stage.add(audio_seconds=processed_audio.size / SAMPLE_RATE, words=len(timing.words))
+        transcript_cache.put(transcript_key, segments, src_lang, timing=timing)
+    except Exception as e:
+        segment_queue.put(e)
+    finally:
+        segment_queue.put(_END_OF_STREAM)
+
+def _translate_batch(job_metrics, translator, segments, src_lang, target_languages, preserve_technical_terms):
+    """
+    Translate stage: translates one micro-batch of segments into every target language.
+
+    Short segments are merged and long ones split before translation, and the
+    translations are cut back into subtitle-sized cues afterwards.
+    """
+    with job_metrics.stage("translate") as stage:
+        units = resegmenter.merge_for_translation(segments)
+        stage.add(source_segments=len(segments))
+        translated = translator.translate_segments_multi(units, src_lang, target_languages, preserve_technical_terms, metrics=stage)
+        return {target_language: resegmenter.to_cues(translated_units) for target_language, translated_units in translated.items()}
+
+def _write_cues(job_metrics, writer, segments):
+    """Subtitle stage: appends cues as they arrive. Runs per segment, so memory isn't sampled."""
+    with job_metrics.stage("subtitles", sample_memory=False) as stage:
+        writer.extend(segments)
+        stage.add(cues=len(segments))
+
+def _iter_queue(segment_queue):
+    """Yields items from a job's segment queue until the end marker, re-raising stage errors."""
+    while True:
+        item = segment_queue.get()
+        if item is _END_OF_STREAM:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
 # --- MAIN PROCESSING FUNCTION ---
-def generate_subtitles_for_video(video_upload_path, apply_noise_reduction, target_language, preserve_technical_terms, quick_process, progress=gr.Progress()):
+def generate_subtitles_for_video(video_upload_path, apply_noise_reduction, target_languages, preserve_technical_terms, quick_process, profile_run=False, progress=gr.Progress()):
     if not video_upload_path:
         raise gr.Error("Error: Please upload a video file to begin.")
 
-    temp_files_to_clean = []
+    open_writers = []
+    # Models stay loaded (not reaped as idle) until the job releases them
+    model_leases = ExitStack()
+    cancelled = threading.Event()
+    job_metrics = JobMetrics(profile=profile_run)
     try:
         duration_limit = 60 if quick_process else None
-        
-        progress(0.1, desc="Step 1/5: Preparing Audio...")
-        processed_audio_path = audio_processor.process_video_or_audio(video_upload_path, apply_noise_reduction, duration_limit)
-        temp_files_to_clean.append(processed_audio_path)
-        
-        if not os.path.exists(processed_audio_path) or os.path.getsize(processed_audio_path) < 1024:
-            raise gr.Error("Failed to extract valid audio. The source might be silent or invalid.")
 
-        progress(0.3, desc="Step 2/5: Transcribing audio...")
-        original_segments, src_lang = transcriber.transcribe_audio(processed_audio_path)
-        
-        progress(0.6, desc="Step 3/5: Analyzing content...")
-        full_transcript_text = analyzer.get_full_text_from_segments(original_segments)
-        summary = analyzer.summarize_text(full_transcript_text)
-        keywords = analyzer.extract_keywords(full_transcript_text)
-
-        original_srt_path = subtitle_generator.create_srt_file(f"subtitles_{src_lang}", original_segments)
-        output_files = [original_srt_path]
-        final_video_subtitle_path = original_srt_path
-        
-        if target_language and target_language != src_lang:
-            progress(0.8, desc=f"Step 4/5: Translating to {target_language.upper()}...")
-            translated_segments = translator.translate_segments(original_segments, src_lang, target_language, preserve_technical_terms)
-            translated_srt_path = subtitle_generator.create_srt_file(f"subtitles_{target_language}", translated_segments)
-            output_files.append(translated_srt_path)
-            final_video_subtitle_path = translated_srt_path
+        # Re-uploads of the same file with the same settings reuse the earlier transcript
+        progress(0.05, desc="Checking for a previous transcript...")
+        transcript_key = transcript_cache.make_key(
+            transcript_cache.fingerprint_file(video_upload_path), apply_noise_reduction, duration_limit, WHISPER_MODEL_SIZE,
+            {**DECODE_OPTIONS, "word_timestamps": WHISPER_WORD_TIMESTAMPS}
+        )
+        cached_transcript = transcript_cache.get(transcript_key)
+
+        if cached_transcript is not None:
+            print("Transcript cache hit; skipping audio processing and transcription.")
+            cached_segments, src_lang = cached_transcript
+            timing = transcript_cache.get_timing(transcript_key)
+            segment_stream = iter(cached_segments)
+            if timing is not None and timing.audio_seconds:
+                audio_duration = timing.audio_seconds
+            else:
+                audio_duration = cached_segments[-1]['end'] if cached_segments else 0.0
+        else:
+            progress(0.1, desc="Step 1/5: Preparing Audio...")
+            processed_audio = scheduler.run("audio", _prepare_audio, job_metrics, video_upload_path, apply_noise_reduction, duration_limit)
+            
+            if processed_audio.size < 512:
+                raise gr.Error("Failed to extract valid audio. The source might be silent or invalid.")
+
+            progress(0.3, desc="Step 2/5: Transcribing audio (waiting for a free slot)...")
+            audio_duration = processed_audio.size / SAMPLE_RATE
+            transcriber = model_leases.enter_context(models.use("transcriber"))
+            segment_queue = queue.Queue()
+            timing = TranscriptTiming()
+            scheduler.submit("whisper", _transcribe_to_queue, job_metrics, transcriber, processed_audio, segment_queue, cancelled, timing, transcript_key)
+            segment_stream = _iter_queue(segment_queue)
+            src_lang = next(segment_stream)
+
+        target_languages = [lang for lang in (target_languages or []) if lang and lang != src_lang]
+        translate = bool(target_languages)
+
+        # Cues are written as soon as each segment is decoded (and translated), into a
+        # directory of this job's own so concurrent jobs never overwrite each other
+        subtitle_generator.remove_old_output_dirs(JOB_OUTPUT_TTL_SECONDS)
+        job_output_dir = subtitle_generator.make_output_dir()
+        original_writer = subtitle_generator.open_stream(f"subtitles_{src_lang}", SUBTITLE_FORMATS, job_output_dir)
+        open_writers.append(original_writer)
+        translated_writers = {}
+        if translate:
+            progress(0.3, desc="Loading translation model...")
+            translator = model_leases.enter_context(models.use("translator"))
+            for target_language in target_languages:
+                translated_writers[target_language] = subtitle_generator.open_stream(f"subtitles_{target_language}", SUBTITLE_FORMATS, job_output_dir)
+                open_writers.append(translated_writers[target_language])
+
+        # Translation micro-batches run on the translate pool while Whisper keeps decoding.
+        # Each batch is encoded once and decoded into every selected language.
+        pending_translations = deque()
+        micro_batch = []
+        def write_finished_translations(wait=False):
+            while pending_translations and (wait or pending_translations[0].done()):
+                for target_language, translated_segments in pending_translations.popleft().result().items():
+                    _write_cues(job_metrics, translated_writers[target_language], translated_segments)
+
+        original_segments = []
+        # The preview is appended to as segments arrive and only sent every few seconds,
+        # so long files don't rebuild and resend the whole transcript per segment
+        preview_buffer = io.StringIO()
+        last_preview_time = 0.0
+        details = f"Source Language Detected: {src_lang.upper()}"
+        step = f"Step 2/5: Transcribing{' & translating' if translate else ''}"
+        for segment in segment_stream:
+            original_segments.append(segment)
+            _write_cues(job_metrics, original_writer, resegmenter.to_cues([segment]))
+            if translate:
+                micro_batch.append(segment)
+                if len(micro_batch) >= TRANSLATION_MICRO_BATCH:
+                    pending_translations.append(scheduler.submit("translate", _translate_batch, job_metrics, translator, micro_batch, src_lang, target_languages, preserve_technical_terms))
+                    micro_batch = []
+                write_finished_translations()
+            progress(0.3 + 0.5 * min(segment['end'] / max(audio_duration, 1e-6), 1.0), desc=f"{step} ({segment['end']:.0f}s / {audio_duration:.0f}s)...")
+            preview_buffer.write(f" {segment['text']}" if preview_buffer.tell() else segment['text'])
+            if time.monotonic() - last_preview_time >= PREVIEW_INTERVAL_SECONDS:
+                last_preview_time = time.monotonic()
+                yield gr.update(), gr.update(), details, preview_buffer.getvalue(), gr.update(), gr.update()
+
+        if translate:
+            if micro_batch:
+                pending_translations.append(scheduler.submit("translate", _translate_batch, job_metrics, translator, micro_batch, src_lang, target_languages, preserve_technical_terms))
+            progress(0.8, desc=f"Step 3/5: Finishing translation to {', '.join(lang.upper() for lang in target_languages)}...")
+            write_finished_translations(wait=True)
+
+        for writer in open_writers:
+            writer.close()
+
+        progress(0.85, desc="Step 4/5: Analyzing content...")
+        analyzer = model_leases.enter_context(models.use("analyzer"))
+        with job_metrics.stage("analyze") as stage:
+            full_transcript_text = analyzer.get_full_text_from_segments(original_segments)
+            summary = analyzer.summarize_text(full_transcript_text)
+            keywords = analyzer.extract_keywords(full_transcript_text)
+            stage.add(segments=len(original_segments), characters=len(full_transcript_text))
+
+        output_files = list(original_writer.paths.values())
+        final_video_subtitle_path = original_writer.path
+        for translated_writer in translated_writers.values():
+            output_files.extend(translated_writer.paths.values())
+        if translated_writers:
+            # The player shows the first selected translation
+            final_video_subtitle_path = translated_writers[target_languages[0]].path
         
         progress(1.0, desc="Step 5/5: Finalizing...")
         
-        processing_summary = (f"Source Language Detected: {src_lang.upper()}\n" + f"Translation Language: {target_language.upper() if target_language else 'N/A'}")
+        processing_summary = (f"Source Language Detected: {src_lang.upper()}\n" + f"Translation Languages: {', '.join(lang.upper() for lang in target_languages) if target_languages else 'N/A'}")
+        if timing is not None:
+            # Speech statistics come from the timing captured during transcription, not a second audio pass
+            timing_stats = timing.stats(audio_duration)
+            if "speech_ratio" in timing_stats:
+                processing_summary += f"\nSpeech: {timing_stats['speech_seconds']:.0f}s ({timing_stats['speech_ratio']:.0%} of the audio)"
+            if "words_per_minute" in timing_stats:
+                processing_summary += f"\nSpeaking Rate: {timing_stats['words_per_minute']:.0f} words/min"
         preview_text = full_transcript_text
         video_player_update = (video_upload_path, final_video_subtitle_path)
         
         increment_usage_count()
 
-        return video_player_update, output_files, processing_summary, preview_text, summary, keywords
+        yield video_player_update, output_files, processing_summary, preview_text, summary, keywords
 
     except Exception as e:
         print(f"An error occurred in the main pipeline: {e}")
@@ -85,12 +305,15 @@ def generate_subtitles_for_video(video_upload_path, apply_noise_reduction, targe
             error_message = str(e)
         raise gr.Error(error_message)
     finally:
-        for path in temp_files_to_clean:
-            if os.path.exists(path):
-                try:
-                    if os.path.isdir(path): shutil.rmtree(path)
-                    else: os.remove(path)
-                except OSError as e_os: print(f"Error cleaning up file/dir {path}: {e_os}")
+        # Stops this job's Whisper task early if the user pressed Stop or the job failed
+        cancelled.set()
+        for writer in open_writers:
+            writer.close()
+        model_leases.close()
+        try:
+            job_metrics.finish(METRICS_DIR)
+            metrics_collector.record_job(job_metrics)
+        except OSError as e_metrics: print(f"Error writing job metrics: {e_metrics}")
 
 
 # --- GRADIO UI ---
@@ -110,7 +333,7 @@ with gr.Blocks(theme=gr.themes.Soft(), title="Global Sound 🌍", css="style.css
         ("Portuguese", "pt"), ("Russian", "ru"), ("Spanish", "es"), ("Tamil", "ta"), 
         ("Ukrainian", "uk"), ("Vietnamese", "vi")
     ]
-    translation_options = [("No Translation", None)] + sorted(language_choices)
+    translation_options = sorted(language_choices)
 
     with gr.Row(equal_height=False):
         # --- Left Column: Inputs & Options ---
@@ -123,8 +346,9 @@ with gr.Blocks(theme=gr.themes.Soft(), title="Global Sound 🌍", css="style.css
                 quick_process_checkbox = gr.Checkbox(label="Quick Process (First 60s Only)", value=True, info="Ideal for testing or a fast preview.")
                 noise_reduction = gr.Checkbox(label="Apply Noise Reduction", value=True, info="Recommended for videos with background noise.")
                 preserve_technical = gr.Checkbox(label="Preserve Technical Terms", value=True, info="Protects words like 'GAN' or 'PyTorch' from translation.")
+                profile_checkbox = gr.Checkbox(label="Profile This Run", value=False, info=f"Saves a cProfile dump next to the job's metrics in '{METRICS_DIR}/'.")
             
-            language_dropdown = gr.Dropdown(label="Translate To", info="Select a language for translation.", choices=translation_options, value=None)
+            language_dropdown = gr.Dropdown(label="Translate To", info="Select one or more languages; they are all translated in the same job.", choices=translation_options, value=[], multiselect=True)
             
             with gr.Row():
                 process_btn = gr.Button("Generate Insights", variant="primary", scale=3)
@@ -142,19 +366,24 @@ with gr.Blocks(theme=gr.themes.Soft(), title="Global Sound 🌍", css="style.css
                 with gr.TabItem("📜 Full Transcript"):
                     preview_output = gr.Textbox(label="Full Transcript", lines=8, interactive=False, show_copy_button=True)
                 with gr.TabItem("⚙️ Processing Details"):
-                    processing_details_output = gr.Textbox(label="Processing Details", lines=3, interactive=False)
+                    processing_details_output = gr.Textbox(label="Processing Details", lines=5, interactive=False)
+                    server_load_output = gr.Textbox(label="Server Load (per pipeline stage)", lines=3, interactive=False)
             
-            output_files = gr.File(label="Download Subtitle Files (.srt)", file_count="multiple", interactive=False)
+            output_files = gr.File(label="Download Subtitle Files (.srt, .vtt, .json)", file_count="multiple", interactive=False)
 
     # --- Event Handling ---
     process_event = process_btn.click(
         fn=generate_subtitles_for_video,
-        inputs=[video_upload_input, noise_reduction, language_dropdown, preserve_technical, quick_process_checkbox],
-        outputs=[video_output, output_files, processing_details_output, preview_output, summary_output, keywords_output]
+        inputs=[video_upload_input, noise_reduction, language_dropdown, preserve_technical, quick_process_checkbox, profile_checkbox],
+        outputs=[video_output, output_files, processing_details_output, preview_output, summary_output, keywords_output],
+        concurrency_limit=JOB_CONCURRENCY
     )
 
     stop_btn.click(fn=None, inputs=None, outputs=None, cancels=[process_event])
 
+    # Refresh the per-stage queue depth every few seconds
+    demo.load(fn=scheduler.format_queue_depth, inputs=None, outputs=server_load_output, every=5)
+
     # --- Footer ---
     gr.Markdown("---")
     
@@ -168,5 +397,7 @@ with gr.Blocks(theme=gr.themes.Soft(), title="Global Sound 🌍", css="style.css
     gr.Markdown("---")
     gr.Markdown("Made with ❤️ using `faster-whisper`, `mBART-50`, `T5-small`, and Gradio.")
 
+demo.queue(max_size=MAX_QUEUED_JOBS)
+
 if __name__ == "__main__":
     demo.launch(debug=True)
@@ -0,0 +1,329 @@
+# batch.py
+#
+# Headless batch mode: transcribes (and optionally translates) every video in a
+# directory or manifest, with no UI server. Models are loaded once; files move
+# through the audio, Whisper and translation stages on the same bounded per-stage
+# pools the app uses, so one file's audio extraction overlaps another's decoding.
+#
+# Each file gets its own output folder with subtitles and a stats.json. stats.json is
+# written last and doubles as the checkpoint: a rerun skips files whose stats say
+# "done" for the same content and settings. Transcripts and translations also land in
+# the persistent caches, so a file interrupted after transcription resumes from there.
+#
+# Usage:
+#   python batch.py videos/ --output-dir subtitles_out --targets es fr
+#   python batch.py manifest.txt --workers 3 --no-noise-reduction
+#
+# A manifest is a text file with one path per line ('#' starts a comment), or a JSON
+# list of paths (or of {"path": ...} objects). Relative paths are resolved against the manifest's folder.
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MEDIA_EXTENSIONS = {".mp4", ".mkv", ".mov", ".avi", ".webm", ".mp3", ".wav", ".m4a", ".flac", ".ogg"}
+
+
+def find_inputs(source):
+    """Returns the absolute paths of the media files in a directory (recursively) or listed in a manifest."""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if os.path.splitext(name)[1].lower() in MEDIA_EXTENSIONS)
+        return sorted(os.path.abspath(path) for path in paths)
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        if source.endswith(".json"):
+            entries = [entry["path"] if isinstance(entry, dict) else entry for entry in json.load(f)]
+        else:
+            entries = [line.split("#", 1)[0].strip() for line in f]
+    return [os.path.abspath(os.path.join(base_dir, entry)) for entry in entries if entry]
+
+
+def output_dir_for(path, output_root):
+    """A stable, collision-free folder per input: the file name plus a short hash of its path."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.blake2b(path.encode("utf-8"), digest_size=4).hexdigest()
+    return os.path.join(output_root, f"{stem}-{digest}")
+
+
+def write_json_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class BatchRunner:
+    def __init__(self, args):
+        """
+        Owns the models, caches and stage pools shared by every file of a batch run.
+
+        Args:
+            args (argparse.Namespace): The parsed command line.
+        """
+        # Imported here so `--help` stays fast and the offline switches are set first
+        from src.audio_processor import AudioProcessor, SAMPLE_RATE
+        from src.job_scheduler import JobScheduler
+        from src.resegmenter import Resegmenter
+        from src.subtitle_generator import SubtitleGenerator
+        from src.transcriber import Transcriber, DECODE_OPTIONS
+        from src.transcript_cache import TranscriptCache
+        from src.translation_cache import TranslationCache
+
+        self.args = args
+        self.sample_rate = SAMPLE_RATE
+        self.decode_options = {**DECODE_OPTIONS, "word_timestamps": args.word_timestamps}
+        self.settings = {
+            "noise_reduction": args.noise_reduction,
+            "max_seconds": args.max_seconds,
+            "whisper_model": args.whisper_model,
+            "decode_options": self.decode_options,
+            "targets": sorted(args.targets),
+            "preserve_terms": args.preserve_terms,
+            "formats": sorted(args.formats),
+            "translator_backend": args.translator_backend,
+            "beam_size": args.beam_size,
+        }
+
+        # Several files decode audio at once; Whisper and mBART each run one task at a time
+        self.scheduler = JobScheduler(
+            {"audio": args.workers, "whisper": 1, "translate": 1},
+            compute_weights={"whisper": 1, "translate": 1} if args.targets else {"whisper": 1},
+            total_threads=args.threads,
+        )
+        self.audio_processor = AudioProcessor()
+        self.subtitle_generator = SubtitleGenerator()
+        self.resegmenter = Resegmenter()
+        self.transcript_cache = TranscriptCache(os.path.join(args.cache_dir, "transcripts.sqlite3"))
+
+        # Models are loaded once, up front, and shared by all files. With several Whisper
+        # worker processes, the Whisper stage's share of the thread budget is split between them.
+        whisper_threads = self.scheduler.threads_per_worker("whisper")
+        self.transcriber = Transcriber(
+            model_size=args.whisper_model,
+            num_workers=args.whisper_workers,
+            cpu_threads_per_worker=max(1, whisper_threads // args.whisper_workers),
+            cpu_threads=whisper_threads,
+            word_timestamps=args.word_timestamps,
+        )
+        self.translator = None
+        if args.targets:
+            from src.translator import Translator
+            self.translator = Translator(
+                cache=TranslationCache(os.path.join(args.cache_dir, "translations.sqlite3")),
+                num_threads=self.scheduler.threads_per_worker("translate"),
+                backend=args.translator_backend,
+                beam_size=args.beam_size,
+            )
+
+    def is_done(self, stats_path, fingerprint):
+        """Checks a file's checkpoint: done, for the same content, with the same settings."""
+        if not os.path.exists(stats_path):
+            return False
+        try:
+            with open(stats_path, encoding="utf-8") as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return stats.get("status") == "done" and stats.get("fingerprint") == fingerprint and stats.get("settings") == self.settings
+
+    def _prepare_audio(self, job_metrics, path):
+        """Audio stage: decodes (and optionally denoises) the file into a 16 kHz array."""
+        with job_metrics.stage("audio") as stage:
+            if self.args.max_seconds is None:
+                audio = self.audio_processor.process_video_or_audio_streaming_to_array(path, self.args.noise_reduction)
+            else:
+                audio = self.audio_processor.process_video_or_audio_to_array(path, self.args.noise_reduction, self.args.max_seconds)
+            stage.add(audio_seconds=audio.size / self.sample_rate)
+        return audio
+
+    def _transcribe(self, job_metrics, audio):
+        """Whisper stage: returns the segments, the detected language and the timing data."""
+        from src.transcript_timing import TranscriptTiming
+
+        with job_metrics.stage("transcribe") as stage:
+            timing = TranscriptTiming()
+            segment_stream, language = self.transcriber.stream_segments(audio, timing=timing)
+            segments = list(segment_stream)
+            stage.add(audio_seconds=audio.size / self.sample_rate, segments=len(segments), words=len(timing.words))
+        return segments, language, timing
+
+    def _translate(self, job_metrics, segments, language, targets):
+        """Translate stage: the whole transcript, merged into even units, into every target at once."""
+        with job_metrics.stage("translate") as stage:
+            units = self.resegmenter.merge_for_translation(segments)
+            stage.add(source_segments=len(segments))
+            translated = self.translator.translate_segments_multi(units, language, targets, self.args.preserve_terms, metrics=stage)
+        return {target: self.resegmenter.to_cues(target_units) for target, target_units in translated.items()}
+
+    def _write_subtitles(self, job_metrics, base_filename, cues, output_dir):
+        with job_metrics.stage("subtitles", sample_memory=False) as stage:
+            with self.subtitle_generator.open_stream(base_filename, self.args.formats, output_dir, self.args.gzip) as writer:
+                writer.extend(cues)
+            stage.add(cues=len(cues))
+        return list(writer.paths.values())
+
+    def process_file(self, path):
+        """
+        Runs one file through every stage and writes its subtitles and stats.json.
+
+        Returns:
+            dict: The file's stats (status "done", "skipped" or "failed").
+        """
+        from src.metrics import JobMetrics
+
+        output_dir = output_dir_for(path, self.args.output_dir)
+        stats_path = os.path.join(output_dir, "stats.json")
+        started = time.perf_counter()
+        try:
+            fingerprint = self.transcript_cache.fingerprint_file(path)
+            if self.is_done(stats_path, fingerprint):
+                with open(stats_path, encoding="utf-8") as f:
+                    stats = json.load(f)
+                print(f"[skip] {path} (already done)")
+                return {**stats, "status": "skipped"}
+
+            os.makedirs(output_dir, exist_ok=True)
+            job_metrics = JobMetrics(job_id=os.path.basename(output_dir))
+
+            transcript_key = self.transcript_cache.make_key(
+                fingerprint, self.args.noise_reduction, self.args.max_seconds, self.args.whisper_model, self.decode_options
+            )
+            cached = self.transcript_cache.get(transcript_key)
+            if cached is not None:
+                segments, language = cached
+                timing = self.transcript_cache.get_timing(transcript_key)
+                if timing is not None and timing.audio_seconds:
+                    audio_seconds = timing.audio_seconds
+                else:
+                    # Without timing data, the end of the last segment stands in for the length
+                    audio_seconds = segments[-1]['end'] if segments else 0.0
+                print(f"[cached] {path}: transcript reused")
+            else:
+                audio = self.scheduler.run("audio", self._prepare_audio, job_metrics, path)
+                audio_seconds = audio.size / self.sample_rate
+                segments, language, timing = self.scheduler.run("whisper", self._transcribe, job_metrics, audio)
+                del audio
+                # Checkpoint: a crash after this point resumes without decoding the audio again
+                self.transcript_cache.put(transcript_key, segments, language, timing=timing)
+
+            outputs = self._write_subtitles(job_metrics, f"subtitles_{language}", self.resegmenter.to_cues(segments), output_dir)
+            targets = [target for target in self.args.targets if target != language]
+            if targets and segments:
+                translations = self.scheduler.run("translate", self._translate, job_metrics, segments, language, targets)
+                for target, cues in translations.items():
+                    outputs += self._write_subtitles(job_metrics, f"subtitles_{target}", cues, output_dir)
+
+            stats = {
+                "status": "done",
+                "source": path,
+                "fingerprint": fingerprint,
+                "settings": self.settings,
+                "language": language,
+                "audio_seconds": audio_seconds,
+                "segments": len(segments),
+                "outputs": outputs,
+                "wall_seconds": time.perf_counter() - started,
+                "timing": timing.stats(audio_seconds) if timing is not None else None,
+                "metrics": job_metrics.to_dict(),
+            }
+            write_json_atomic(stats_path, stats)
+            print(f"[done] {path}: {audio_seconds / 60:.1f} min of audio in {stats['wall_seconds']:.1f}s")
+            return stats
+
+        except Exception as e:
+            print(f"[failed] {path}: {e}")
+            stats = {"status": "failed", "source": path, "error": f"{type(e).__name__}: {e}", "wall_seconds": time.perf_counter() - started}
+            os.makedirs(output_dir, exist_ok=True)
+            write_json_atomic(stats_path, stats)
+            return stats
+
+    def run(self, paths):
+        """Processes every file, `workers` at a time, and returns a summary of the run."""
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.workers, thread_name_prefix="batch-file") as pool:
+            results = list(pool.map(self.process_file, paths))
+        wall_seconds = time.perf_counter() - started
+
+        processed = [r for r in results if r["status"] == "done"]
+        audio_seconds = sum(r["audio_seconds"] for r in processed)
+        return {
+            "files": len(results),
+            "done": len(processed),
+            "skipped": sum(r["status"] == "skipped" for r in results),
+            "failed": [r["source"] for r in results if r["status"] == "failed"],
+            "audio_hours": audio_seconds / 3600,
+            "wall_hours": wall_seconds / 3600,
+            # Only files processed in this run count towards throughput
+            "audio_hours_per_hour": audio_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+            "settings": self.settings,
+        }
+
+    def close(self):
+        self.scheduler.shutdown()
+        self.transcriber.close()
+        self.transcript_cache.close()
+        if self.translator is not None and self.translator.cache is not None:
+            self.translator.cache.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate subtitles for a directory or manifest of videos, without the UI.")
+    parser.add_argument("source", help="A directory of media files, or a manifest (.txt with one path per line, or a .json list).")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--targets", nargs="*", default=[], help="Languages to translate into, e.g. es fr de.")
+    parser.add_argument("--preserve-terms", action=argparse.BooleanOptionalAction, default=True, help="Keep technical terms untranslated.")
+    parser.add_argument("--workers", type=int, default=2, help="Files in flight at once (and audio-stage workers).")
+    parser.add_argument("--threads", type=int, help="CPU thread budget split between Whisper and mBART. Defaults to all cores.")
+    parser.add_argument("--whisper-model", default="base")
+    parser.add_argument("--whisper-workers", type=int, default=1,
+                        help="Whisper processes decoding chunks of one file in parallel; they share Whisper's thread budget.")
+    parser.add_argument("--word-timestamps", action=argparse.BooleanOptionalAction, default=False, help="Also align and store word times (slower).")
+    parser.add_argument("--noise-reduction", action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument("--max-seconds", type=float, help="Only process the first N seconds of each file.")
+    parser.add_argument("--translator-backend", default="torch", choices=["torch", "torch-int8", "ctranslate2"])
+    parser.add_argument("--beam-size", type=int, help="Translation beams; 1 is greedy. Defaults to the model's 5.")
+    parser.add_argument("--formats", nargs="+", default=["srt", "vtt", "json"], choices=["srt", "vtt", "json"])
+    parser.add_argument("--gzip", action="store_true", help="Gzip the subtitle files.")
+    parser.add_argument("--cache-dir", default=".cache", help="Where the transcript and translation caches live.")
+    parser.add_argument("--allow-downloads", action="store_true", help="Let Hugging Face download missing models.")
+    args = parser.parse_args()
+
+    if not args.allow_downloads:
+        # Models must already be on disk; nothing is fetched at run time
+        os.environ["HF_HUB_OFFLINE"] = "1"
+        os.environ["TRANSFORMERS_OFFLINE"] = "1"
+
+    paths = find_inputs(args.source)
+    if not paths:
+        print(f"No media files found in: {args.source}")
+        sys.exit(1)
+    print(f"Found {len(paths)} file(s).")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    runner = BatchRunner(args)
+    try:
+        summary = runner.run(paths)
+    finally:
+        runner.close()
+
+    summary_path = os.path.join(args.output_dir, "batch_summary.json")
+    write_json_atomic(summary_path, summary)
+    print(
+        f"\n{summary['done']} done, {summary['skipped']} skipped, {len(summary['failed'])} failed. "
+        f"{summary['audio_hours']:.2f} h of audio in {summary['wall_hours']:.2f} h: "
+        f"{summary['audio_hours_per_hour']:.1f} hours of audio per hour."
+    )
+    print(f"Summary written to: {summary_path}")
+    if summary["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
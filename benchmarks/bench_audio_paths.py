@@ -0,0 +1,79 @@
+# benchmarks/bench_audio_paths.py
+#
+# Compares the file-based audio path (moviepy -> WAV -> librosa -> WAV -> Whisper)
+# with the in-memory path (ffmpeg pipe -> NumPy -> Whisper). Each path runs in its
+# own child process so peak RSS is measured independently.
+#
+# Usage:
+#   python -m benchmarks.bench_audio_paths path/to/30min_video.mp4 [--no-noise-reduction] [--skip-transcription]
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+
+def run_path(mode, source_path, apply_noise_reduction, transcribe):
+    """Runs a single path in the current process and returns its measurements."""
+    from src.audio_processor import AudioProcessor
+
+    audio_processor = AudioProcessor()
+    transcriber = None
+    if transcribe:
+        from src.transcriber import Transcriber
+        transcriber = Transcriber(model_size="base")
+
+    start = time.perf_counter()
+    if mode == "file":
+        audio = audio_processor.process_video_or_audio(source_path, apply_noise_reduction)
+    else:
+        audio = audio_processor.process_video_or_audio_to_array(source_path, apply_noise_reduction)
+    audio_seconds = time.perf_counter() - start
+
+    if transcriber is not None:
+        transcriber.transcribe_audio(audio)
+    total_seconds = time.perf_counter() - start
+
+    if mode == "file":
+        os.remove(audio)
+
+    # ru_maxrss is reported in kilobytes on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"mode": mode, "audio_seconds": audio_seconds, "total_seconds": total_seconds, "peak_rss_mb": peak_rss_mb}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark file-based vs in-memory audio paths.")
+    parser.add_argument("source_path")
+    parser.add_argument("--no-noise-reduction", action="store_true")
+    parser.add_argument("--skip-transcription", action="store_true")
+    parser.add_argument("--child", choices=["file", "memory"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    apply_noise_reduction = not args.no_noise_reduction
+    transcribe = not args.skip_transcription
+
+    if args.child:
+        print(json.dumps(run_path(args.child, args.source_path, apply_noise_reduction, transcribe)))
+        return
+
+    results = []
+    for mode in ("file", "memory"):
+        cmd = [sys.executable, "-m", "benchmarks.bench_audio_paths", args.source_path, "--child", mode]
+        if args.no_noise_reduction:
+            cmd.append("--no-noise-reduction")
+        if args.skip_transcription:
+            cmd.append("--skip-transcription")
+        output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"\n{'path':>8} {'audio prep (s)':>15} {'end-to-end (s)':>15} {'peak RSS (MB)':>14}")
+    for r in results:
+        print(f"{r['mode']:>8} {r['audio_seconds']:>15.2f} {r['total_seconds']:>15.2f} {r['peak_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
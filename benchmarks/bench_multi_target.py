@@ -0,0 +1,55 @@
+# benchmarks/bench_multi_target.py
+#
+# Compares translating a transcript into several languages with one
+# Translator.translate_segments call per language against a single
+# translate_segments_multi call, which encodes each batch only once.
+#
+# Usage:
+#   python -m benchmarks.bench_multi_target
+#   python -m benchmarks.bench_multi_target --num-segments 200 --targets es fr de ja hi
+
+import argparse
+import time
+
+from benchmarks.fixtures import synthetic_segments
+from src.translator import Translator
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-target translation.")
+    parser.add_argument("--num-segments", type=int, default=100)
+    parser.add_argument("--src-lang", default="en")
+    parser.add_argument("--targets", nargs="+", default=["es", "fr", "de", "ja", "hi"])
+    parser.add_argument("--model", default="facebook/mbart-large-50-many-to-many-mmt")
+    args = parser.parse_args()
+
+    segments = synthetic_segments(args.num_segments)
+    # No cache, so both approaches do the full amount of model work
+    translator = Translator(model_name=args.model)
+
+    # Warm-up so the first measured run doesn't pay for lazy initialization
+    translator.translate_segments_multi(segments[:2], args.src_lang, args.targets[:2], True)
+
+    start = time.perf_counter()
+    looped = {target: translator.translate_segments(segments, args.src_lang, target, True) for target in args.targets}
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    combined = translator.translate_segments_multi(segments, args.src_lang, args.targets, True)
+    multi_seconds = time.perf_counter() - start
+
+    identical = sum(
+        a['text'] == b['text'] for target in args.targets for a, b in zip(looped[target], combined[target])
+    )
+
+    print(f"\n{args.num_segments} segments into {len(args.targets)} languages ({', '.join(args.targets)})")
+    print(f"{'approach':<28} {'seconds':>10} {'translations/sec':>18}")
+    total = args.num_segments * len(args.targets)
+    print(f"{'loop over languages':<28} {loop_seconds:>10.2f} {total / loop_seconds:>18.2f}")
+    print(f"{'translate_segments_multi':<28} {multi_seconds:>10.2f} {total / multi_seconds:>18.2f}")
+    print(f"Speedup: {loop_seconds / multi_seconds:.2f}x")
+    print(f"Identical translations: {identical}/{total}")
+
+
+if __name__ == "__main__":
+    main()
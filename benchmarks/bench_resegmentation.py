@@ -0,0 +1,80 @@
+# benchmarks/bench_resegmentation.py
+#
+# Shows what the Resegmenter does to translation batching: the number of decoder
+# calls (batches) and the share of padding in them, before and after merging and
+# splitting a Whisper-like transcript. Token counts are estimated from characters
+# (~4 per token, plus the language and end tokens), so no model is needed.
+#
+# Usage:
+#   python -m benchmarks.bench_resegmentation
+#   python -m benchmarks.bench_resegmentation --num-segments 5000 --batch-size 16
+
+import argparse
+import random
+import time
+
+from benchmarks.fixtures import SAMPLE_SENTENCES
+from src.resegmenter import Resegmenter
+from src.translator import Translator
+
+
+def whisper_like_segments(num_segments, seed=0):
+    """Segments ranging from one-word fragments to several sentences run together."""
+    rng = random.Random(seed)
+    segments = []
+    position = 0.0
+    for _ in range(num_segments):
+        shape = rng.random()
+        if shape < 0.3:
+            words = rng.choice(SAMPLE_SENTENCES).split()
+            text = " ".join(words[:rng.randint(1, 3)])
+        elif shape < 0.9:
+            text = rng.choice(SAMPLE_SENTENCES)
+        else:
+            text = " ".join(rng.choice(SAMPLE_SENTENCES) for _ in range(rng.randint(3, 6)))
+        duration = 0.4 + 0.06 * len(text)
+        segments.append({"start": position, "end": position + duration, "text": text})
+        position += duration + rng.uniform(0.0, 1.2)
+    return segments
+
+
+def batch_stats(segments, batch_size, max_batch_tokens):
+    token_lengths = [len(segment['text']) // 4 + 2 for segment in segments]
+    batches = Translator._make_batches(token_lengths, batch_size, max_batch_tokens)
+    real = sum(token_lengths)
+    padded = sum(max(token_lengths[i] for i in batch) * len(batch) for batch in batches)
+    sizes = [len(batch) for batch in batches]
+    return len(batches), 1 - real / padded, sum(sizes) / len(sizes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript resegmentation.")
+    parser.add_argument("--num-segments", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--max-batch-tokens", type=int, default=2048)
+    args = parser.parse_args()
+
+    segments = whisper_like_segments(args.num_segments)
+    resegmenter = Resegmenter()
+
+    start = time.perf_counter()
+    units = resegmenter.merge_for_translation(segments)
+    merge_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    cues = resegmenter.to_cues(units)
+    cue_seconds = time.perf_counter() - start
+
+    print(f"\n{'input':<24} {'segments':>9} {'decoder calls':>14} {'padding':>9} {'mean batch':>11}")
+    for name, items in [("whisper segments", segments), ("translation units", units)]:
+        calls, padding, mean_batch = batch_stats(items, args.batch_size, args.max_batch_tokens)
+        print(f"{name:<24} {len(items):>9} {calls:>14} {padding:>9.1%} {mean_batch:>11.1f}")
+
+    longest_line = max(len(line) for cue in cues for line in cue['text'].split("\n"))
+    most_lines = max(cue['text'].count("\n") + 1 for cue in cues)
+    longest_cue = max(cue['end'] - cue['start'] for cue in cues)
+    print(f"\n{len(cues)} cues: longest line {longest_line} chars, at most {most_lines} lines, longest {longest_cue:.1f}s")
+    print(f"merge_for_translation {merge_seconds * 1000:.1f} ms, to_cues {cue_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/bench_term_protection.py
+#
+# Compares the previous per-segment term protection (regex compiled on every call,
+# one str.replace per placeholder) with TermProtector's single-pass batch API.
+#
+# Usage:
+#   python -m benchmarks.bench_term_protection
+#   python -m benchmarks.bench_term_protection --num-segments 50000 --glossary-size 20000
+
+import argparse
+import random
+import re
+import time
+
+from benchmarks.fixtures import synthetic_segments
+from src.term_protection import TermProtector
+
+
+def legacy_protect(text):
+    """The implementation TermProtector replaced, kept here as the baseline."""
+    protections = {}
+    pattern = re.compile(r'\b([A-Z]{2,}|[A-Za-z]*[0-9]+[A-Za-z]*)\b')
+
+    def replace_func(match):
+        placeholder = f"__TERM{len(protections)}__"
+        protections[placeholder] = match.group(0)
+        return placeholder
+
+    return pattern.sub(replace_func, text), protections
+
+
+def legacy_restore(text, protections):
+    for placeholder, term in protections.items():
+        text = text.replace(placeholder, term)
+    return text
+
+
+def legacy_protect_glossary(text, glossary):
+    """What extending the legacy approach to a glossary costs: one scan per term per segment."""
+    text, protections = legacy_protect(text)
+    for term in glossary:
+        if term in text:
+            placeholder = f"__TERM{len(protections)}__"
+            protections[placeholder] = term
+            text = text.replace(term, placeholder)
+    return text, protections
+
+
+def synthetic_glossary(size, seed=0):
+    """Random two-word lowercase phrases, plus a few that occur in the fixture sentences."""
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    glossary = {"loss curve", "single GPU", "small dataset"}
+    while len(glossary) < size:
+        glossary.add(" ".join("".join(rng.choice(letters) for _ in range(rng.randint(4, 9))) for _ in range(2)))
+    return sorted(glossary)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark technical-term protection.")
+    parser.add_argument("--num-segments", type=int, default=10000)
+    parser.add_argument("--glossary-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    texts = [segment["text"] for segment in synthetic_segments(args.num_segments)]
+
+    start = time.perf_counter()
+    legacy = [legacy_protect(text) for text in texts]
+    restored = [legacy_restore(protected, protections) for protected, protections in legacy]
+    legacy_seconds = time.perf_counter() - start
+    assert restored == texts
+
+    glossary = synthetic_glossary(args.glossary_size)
+    start = time.perf_counter()
+    legacy = [legacy_protect_glossary(text, glossary) for text in texts]
+    restored = [legacy_restore(protected, protections) for protected, protections in legacy]
+    legacy_glossary_seconds = time.perf_counter() - start
+
+    protector = TermProtector()
+    start = time.perf_counter()
+    protected, terms = protector.protect_batch(texts)
+    assert protector.restore_batch(protected, terms) == texts
+    batch_seconds = time.perf_counter() - start
+
+    build_start = time.perf_counter()
+    glossary_protector = TermProtector(glossary)
+    build_seconds = time.perf_counter() - build_start
+    start = time.perf_counter()
+    protected, terms = glossary_protector.protect_batch(texts)
+    assert glossary_protector.restore_batch(protected, terms) == texts
+    glossary_seconds = time.perf_counter() - start
+
+    print(f"\n{args.num_segments} segments, protect + restore")
+    print(f"{'implementation':<32} {'seconds':>10} {'segments/sec':>14}")
+    for name, seconds in [
+        ("legacy (per segment)", legacy_seconds),
+        ("TermProtector", batch_seconds),
+        (f"legacy + {args.glossary_size} terms", legacy_glossary_seconds),
+        (f"TermProtector + {args.glossary_size} terms", glossary_seconds),
+    ]:
+        print(f"{name:<32} {seconds:>10.3f} {args.num_segments / seconds:>14.0f}")
+    print(f"Glossary automaton built in {build_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_translation_batching.py
+#
+# Measures Translator.translate_segments throughput (segments/sec) for different
+# batch sizes on the same transcript.
+#
+# Usage:
+#   python -m benchmarks.bench_translation_batching --srt path/to/subtitles_en.srt
+#   python -m benchmarks.bench_translation_batching --num-segments 200
+
+import argparse
+import time
+
+from benchmarks.fixtures import synthetic_segments
+from src.translator import Translator
+
+
+def load_srt_segments(srt_path):
+    """Reads an .srt file into the {'start', 'end', 'text'} segment format."""
+    segments = []
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        blocks = f.read().strip().split("\n\n")
+    for block in blocks:
+        lines = block.strip().splitlines()
+        if len(lines) < 3:
+            continue
+        segments.append({"start": 0.0, "end": 0.0, "text": " ".join(lines[2:])})
+    return segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched translation.")
+    parser.add_argument("--srt", help="Transcript to translate. Defaults to a synthetic one.")
+    parser.add_argument("--num-segments", type=int, default=100)
+    parser.add_argument("--src-lang", default="en")
+    parser.add_argument("--target-lang", default="es")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    segments = load_srt_segments(args.srt) if args.srt else synthetic_segments(args.num_segments)
+    translator = Translator()
+
+    # Warm-up so the first measured run doesn't pay for lazy initialization
+    translator.translate_segments(segments[:2], args.src_lang, args.target_lang, True, batch_size=2)
+
+    print(f"\n{'batch_size':>10} {'seconds':>10} {'segments/sec':>14}")
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        translator.translate_segments(segments, args.src_lang, args.target_lang, True, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"{batch_size:>10} {elapsed:>10.2f} {len(segments) / elapsed:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
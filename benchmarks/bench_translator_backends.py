@@ -0,0 +1,133 @@
+# benchmarks/bench_translator_backends.py
+#
+# Compares the Translator backends (fp32 torch, int8 torch, CTranslate2) on latency,
+# peak memory and quality. Quality is corpus BLEU and chrF against the reference
+# translations in benchmarks/fixtures.py, so the numbers are only a sanity check that
+# quantization or a smaller beam didn't break the output, not a proper evaluation.
+# Each backend runs in its own spawned process so its memory is measured alone.
+#
+# Usage:
+#   python -m benchmarks.bench_translator_backends
+#   python -m benchmarks.bench_translator_backends --backends torch ctranslate2 --beam-sizes 1 5 --repeat 20
+
+import argparse
+import math
+import multiprocessing
+import resource
+import time
+from collections import Counter
+
+BACKENDS = ["torch", "torch-int8", "ctranslate2"]
+
+
+def _ngrams(tokens, n):
+    return Counter(tuple(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+
+
+def corpus_bleu(hypotheses, references, max_n=4):
+    """Corpus BLEU (0-100) with whitespace tokenization and the standard brevity penalty."""
+    matches = [0] * max_n
+    totals = [0] * max_n
+    hyp_length = ref_length = 0
+    for hypothesis, reference in zip(hypotheses, references):
+        hyp_tokens, ref_tokens = hypothesis.split(), reference.split()
+        hyp_length += len(hyp_tokens)
+        ref_length += len(ref_tokens)
+        for n in range(1, max_n + 1):
+            hyp_counts, ref_counts = _ngrams(hyp_tokens, n), _ngrams(ref_tokens, n)
+            matches[n - 1] += sum(min(count, ref_counts[gram]) for gram, count in hyp_counts.items())
+            totals[n - 1] += max(len(hyp_tokens) - n + 1, 0)
+    if not hyp_length or min(matches) == 0:
+        return 0.0
+    log_precision = sum(math.log(m / t) for m, t in zip(matches, totals)) / max_n
+    brevity_penalty = 1.0 if hyp_length > ref_length else math.exp(1 - ref_length / hyp_length)
+    return 100 * brevity_penalty * math.exp(log_precision)
+
+
+def corpus_chrf(hypotheses, references, max_n=6, beta=2):
+    """Corpus chrF (0-100): character n-gram F-score, whitespace removed, as in sacrebleu."""
+    scores = []
+    for n in range(1, max_n + 1):
+        matched = hyp_total = ref_total = 0
+        for hypothesis, reference in zip(hypotheses, references):
+            hyp_counts = _ngrams(list(hypothesis.replace(" ", "")), n)
+            ref_counts = _ngrams(list(reference.replace(" ", "")), n)
+            matched += sum(min(count, ref_counts[gram]) for gram, count in hyp_counts.items())
+            hyp_total += sum(hyp_counts.values())
+            ref_total += sum(ref_counts.values())
+        scores.append((matched / hyp_total if hyp_total else 0.0, matched / ref_total if ref_total else 0.0))
+    precision = sum(p for p, _ in scores) / max_n
+    recall = sum(r for _, r in scores) / max_n
+    if precision + recall == 0:
+        return 0.0
+    return 100 * (1 + beta ** 2) * precision * recall / (beta ** 2 * precision + recall)
+
+
+def _run_backend(backend, beam_size, model_name, targets, repeat):
+    """Child-process entry point: loads one backend and translates the fixture."""
+    from benchmarks.fixtures import REFERENCE_TRANSLATIONS, SAMPLE_SENTENCES
+    from src.translator import Translator
+
+    segments = [{"start": float(i), "end": float(i + 1), "text": text} for i, text in enumerate(SAMPLE_SENTENCES)]
+
+    load_start = time.perf_counter()
+    translator = Translator(model_name=model_name, backend=backend, beam_size=beam_size)
+    load_seconds = time.perf_counter() - load_start
+
+    # Warm-up so the measured runs don't pay for lazy initialization
+    translator.translate_segments_multi(segments[:2], "en", targets, False)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = translator.translate_segments_multi(segments, "en", targets, False)
+    latency = (time.perf_counter() - start) / repeat
+
+    quality = {}
+    for target in targets:
+        hypotheses = [segment["text"] for segment in results[target]]
+        quality[target] = {
+            "bleu": corpus_bleu(hypotheses, REFERENCE_TRANSLATIONS[target]),
+            "chrf": corpus_chrf(hypotheses, REFERENCE_TRANSLATIONS[target]),
+        }
+    return {
+        "load_s": load_seconds,
+        "latency_s": latency,
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "quality": quality,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Translator backends.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=BACKENDS)
+    parser.add_argument("--beam-sizes", type=int, nargs="+", default=[1, 5], help="1 is greedy decoding.")
+    parser.add_argument("--targets", nargs="+", choices=["es", "fr"], default=["es", "fr"])
+    parser.add_argument("--model", default="facebook/mbart-large-50-many-to-many-mmt")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for backend in args.backends:
+        for beam_size in args.beam_sizes:
+            print(f"Running {backend}, beam size {beam_size}...")
+            with context.Pool(1) as pool:
+                try:
+                    result = pool.apply(_run_backend, (backend, beam_size, args.model, args.targets, args.repeat))
+                except Exception as e:
+                    print(f"  failed: {type(e).__name__}: {e}")
+                    continue
+            rows.append((backend, beam_size, result))
+
+    header = f"\n{'backend':<12} {'beams':>5} {'load (s)':>9} {'latency (s)':>12} {'peak RSS (MB)':>14}"
+    header += "".join(f" {target + ' BLEU':>8} {target + ' chrF':>8}" for target in args.targets)
+    print(header)
+    for backend, beam_size, result in rows:
+        line = f"{backend:<12} {beam_size:>5} {result['load_s']:>9.1f} {result['latency_s']:>12.3f} {result['peak_rss_mb']:>14.0f}"
+        line += "".join(f" {result['quality'][t]['bleu']:>8.1f} {result['quality'][t]['chrf']:>8.1f}" for t in args.targets)
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
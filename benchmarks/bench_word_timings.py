@@ -0,0 +1,80 @@
+# benchmarks/bench_word_timings.py
+#
+# Memory and build time of word timestamps for long transcripts: one dict per word
+# (what converting faster-whisper's Word objects naively gives) versus the columnar
+# TranscriptTiming. Also reports the serialized size stored in the transcript cache.
+#
+# Usage:
+#   python -m benchmarks.bench_word_timings
+#   python -m benchmarks.bench_word_timings --hours 1 10 --words-per-minute 160
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks.fixtures import SAMPLE_SENTENCES
+from src.transcript_timing import TranscriptTiming
+
+
+def synthetic_words(hours, words_per_minute, seed=0):
+    """Yields segments as lists of (word, start, end, probability) tuples."""
+    rng = random.Random(seed)
+    vocabulary = [f" {word}" for sentence in SAMPLE_SENTENCES for word in sentence.split()]
+    total_words = int(hours * 60 * words_per_minute)
+    step = 60.0 / words_per_minute
+    position = 0.0
+    produced = 0
+    while produced < total_words:
+        count = min(rng.randint(5, 25), total_words - produced)
+        words = []
+        for _ in range(count):
+            words.append((rng.choice(vocabulary), position, position + step * 0.8, rng.random()))
+            position += step
+        produced += count
+        yield words
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark word timestamp storage.")
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 5])
+    parser.add_argument("--words-per-minute", type=int, default=150)
+    args = parser.parse_args()
+
+    print(f"\n{'audio':>6} {'words':>9} {'storage':<18} {'build (s)':>10} {'memory (MB)':>12}")
+    for hours in args.hours:
+        segments = list(synthetic_words(hours, args.words_per_minute))
+        words = sum(len(segment) for segment in segments)
+
+        def as_dicts():
+            return [
+                [{"word": w, "start": s, "end": e, "probability": p} for w, s, e, p in segment]
+                for segment in segments
+            ]
+
+        def as_columns():
+            timing = TranscriptTiming()
+            for segment in segments:
+                timing.add_segment(segment)
+            timing.words
+            return timing
+
+        _, dict_seconds, dict_mb = measure(as_dicts)
+        timing, column_seconds, column_mb = measure(as_columns)
+        print(f"{hours:>5g}h {words:>9} {'dict per word':<18} {dict_seconds:>10.3f} {dict_mb:>12.1f}")
+        print(f"{hours:>5g}h {words:>9} {'TranscriptTiming':<18} {column_seconds:>10.3f} {column_mb:>12.1f}")
+        print(f"{'':>16} cached as {len(timing.to_bytes()) / 1e6:.2f} MB compressed")
+
+
+if __name__ == "__main__":
+    main()
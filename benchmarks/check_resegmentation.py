@@ -0,0 +1,68 @@
+# benchmarks/check_resegmentation.py
+#
+# Checks Resegmenter.to_cues against its cue limits on hand-picked inputs: cues
+# never stay on screen longer than max_cue_seconds, text is only cut inside a clause
+# when the clause alone breaks the line limits, and lines stay within bounds.
+#
+# Usage:
+#   python -m benchmarks.check_resegmentation
+
+import sys
+
+from src.resegmenter import Resegmenter, CLAUSE_BOUNDARY, SENTENCE_BOUNDARY
+
+# (name, segment, expected cue texts or None to only check the limits)
+CASES = [
+    ("short unit over a long span", {"start": 0.0, "end": 20.0, "text": "Okay."}, ["Okay."]),
+    ("short sentence over a long span", {"start": 0.0, "end": 20.0, "text": "Okay, so let's go."}, ["Okay,", "so let's go."]),
+    ("short sentence over a short span", {"start": 3.0, "end": 5.0, "text": "Okay, so let's go."}, ["Okay, so let's go."]),
+    ("several sentences over a long span", {
+        "start": 10.0, "end": 40.0,
+        "text": "We trained the model for three days. Then, after tuning the learning rate, "
+                "the loss finally went down. The results are in the paper, section four.",
+    }, None),
+    ("one long clause", {
+        "start": 0.0, "end": 12.0,
+        "text": "this clause runs on without any punctuation for far longer than two subtitle lines could ever hold on screen",
+    }, None),
+]
+
+
+def clauses(text):
+    return {clause for sentence in SENTENCE_BOUNDARY.split(text) for clause in CLAUSE_BOUNDARY.split(sentence)}
+
+
+def check(resegmenter, name, segment, expected):
+    cues = resegmenter.to_cues([segment])
+    texts = [" ".join(cue['text'].split()) for cue in cues]
+    problems = []
+    if expected is not None and texts != expected:
+        problems.append(f"expected cues {expected}, got {texts}")
+    for cue, text in zip(cues, texts):
+        lines = cue['text'].split("\n")
+        if cue['end'] - cue['start'] > resegmenter.max_cue_seconds + 1e-9:
+            problems.append(f"cue {text!r} lasts {cue['end'] - cue['start']:.1f}s")
+        if not segment['start'] <= cue['start'] <= cue['end'] <= segment['end']:
+            problems.append(f"cue {text!r} leaves the segment's span")
+        if len(lines) > resegmenter.max_lines or max(len(line) for line in lines) > resegmenter.max_line_chars:
+            problems.append(f"cue {text!r} breaks the line limits")
+    # A clause that fits in one cue must never be cut between its words
+    whole = [c for c in clauses(segment['text']) if len(resegmenter._wrap(c)) <= resegmenter.max_lines]
+    for clause in whole:
+        if not any(clause in text for text in texts):
+            problems.append(f"clause {clause!r} was split across cues")
+    print(f"{'FAIL' if problems else 'PASS'}  {name}: {len(cues)} cue(s)")
+    for problem in problems:
+        print(f"      {problem}")
+    return not problems
+
+
+def main():
+    resegmenter = Resegmenter()
+    results = [check(resegmenter, name, segment, expected) for name, segment, expected in CASES]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/check_streaming_denoise.py
+#
+# Checks that AudioProcessor.denoise_stream reproduces whole-file noise reduction
+# within a tolerance, on a deterministic synthetic signal (a tone with pauses plus
+# white noise).
+#
+# Usage:
+#   python -m benchmarks.check_streaming_denoise [--seconds 120] [--chunk-seconds 20] [--tolerance 0.05]
+
+import argparse
+import sys
+import time
+
+import noisereduce as nr
+import numpy as np
+
+from src.audio_processor import AudioProcessor, SAMPLE_RATE
+
+
+def synthetic_noisy_signal(seconds, sr=SAMPLE_RATE, seed=0):
+    """A 220 Hz tone switched on and off every second, buried in white noise."""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sr), dtype=np.float32) / sr
+    gate = (np.floor(t) % 2 == 0).astype(np.float32)
+    tone = 0.5 * np.sin(2 * np.pi * 220 * t) * gate
+    return (tone + 0.05 * rng.standard_normal(t.size)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streaming and whole-file noise reduction.")
+    parser.add_argument("--seconds", type=float, default=120.0)
+    parser.add_argument("--chunk-seconds", type=float, default=20.0)
+    parser.add_argument("--overlap-seconds", type=float, default=5.0)
+    parser.add_argument("--tolerance", type=float, default=0.05, help="Maximum relative RMS error.")
+    args = parser.parse_args()
+
+    y = synthetic_noisy_signal(args.seconds)
+    chunk = int(args.chunk_seconds * SAMPLE_RATE)
+
+    # The reference is a single STFT pass over the whole signal (noisereduce's own
+    # internal chunking is disabled so it doesn't introduce seams of its own)
+    start = time.perf_counter()
+    whole = nr.reduce_noise(y=y, sr=SAMPLE_RATE, chunk_size=y.size + 1).astype(np.float32)
+    whole_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chunks = (y[i:i + chunk] for i in range(0, y.size, chunk))
+    streamed = np.concatenate(list(AudioProcessor().denoise_stream(chunks, overlap_seconds=args.overlap_seconds)))
+    streamed_seconds = time.perf_counter() - start
+
+    if streamed.size != whole.size:
+        print(f"FAIL: length mismatch ({streamed.size} vs {whole.size} samples)")
+        sys.exit(1)
+
+    relative_rms_error = np.sqrt(np.mean((streamed - whole) ** 2)) / np.sqrt(np.mean(whole ** 2))
+    print(f"whole-file: {whole_seconds:.2f}s, streaming: {streamed_seconds:.2f}s")
+    print(f"relative RMS error: {relative_rms_error:.4f} (tolerance {args.tolerance})")
+    if relative_rms_error > args.tolerance:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+# benchmarks/run_benchmarks.py
+#
+# Reproducible end-to-end benchmark suite. Every pipeline stage is measured on
+# deterministic synthetic fixtures (see benchmarks/fixtures.py), each case in its own
+# child process so peak RSS is attributed to that case alone. Results are written as
+# JSON and can be compared against a stored baseline.
+#
+# Usage:
+#   python -m benchmarks.run_benchmarks --output results.json
+#   python -m benchmarks.run_benchmarks --durations 1 --cues 10 1000 --stages subtitles noise_reduction
+#   python -m benchmarks.run_benchmarks --translator-model path/to/tiny-mbart --baseline benchmarks/baseline.json
+#
+# Models: --whisper-model defaults to "tiny". Translation is only benchmarked when
+# --translator-model is given (e.g. a small local mBART-50-compatible checkpoint).
+# Hugging Face downloads are disabled, so models must already be on disk.
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+STAGES = ["audio_decode", "noise_reduction", "transcribe", "translate", "subtitles"]
+
+
+def _peak_rss_mb():
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _case_audio_decode(options, kind, minutes):
+    from benchmarks.fixtures import audio_fixture, video_fixture
+    from src.audio_processor import AudioProcessor
+
+    source = video_fixture(kind, minutes) or audio_fixture(kind, minutes)
+    audio_processor = AudioProcessor()
+    start = time.perf_counter()
+    y = audio_processor.load_audio_array(source)
+    latency = time.perf_counter() - start
+    return {"input": os.path.basename(source), "latency_s": latency, "items": {"audio_seconds": y.size / 16000}}
+
+
+def _case_noise_reduction(options, kind, minutes):
+    from benchmarks.fixtures import GENERATORS
+    from src.audio_processor import AudioProcessor, SAMPLE_RATE
+
+    y = GENERATORS[kind](minutes * 60)
+    chunk = int(30 * SAMPLE_RATE)
+    audio_processor = AudioProcessor()
+    start = time.perf_counter()
+    for _ in audio_processor.denoise_stream(y[i:i + chunk] for i in range(0, y.size, chunk)):
+        pass
+    latency = time.perf_counter() - start
+    return {"input": f"{kind}_{minutes:g}min", "latency_s": latency, "items": {"audio_seconds": y.size / SAMPLE_RATE}}
+
+
+def _case_transcribe(options, kind, minutes):
+    from benchmarks.fixtures import GENERATORS
+    from src.transcriber import Transcriber
+
+    y = GENERATORS[kind](minutes * 60)
+    load_start = time.perf_counter()
+    transcriber = Transcriber(model_size=options["whisper_model"])
+    load_seconds = time.perf_counter() - load_start
+    start = time.perf_counter()
+    segments, _ = transcriber.transcribe_audio(y)
+    latency = time.perf_counter() - start
+    return {
+        "input": f"{kind}_{minutes:g}min",
+        "latency_s": latency,
+        "load_s": load_seconds,
+        "items": {"audio_seconds": y.size / 16000, "segments": len(segments)},
+    }
+
+
+def _case_translate(options, num_cues):
+    from benchmarks.fixtures import synthetic_segments
+    from src.translator import Translator
+
+    segments = synthetic_segments(num_cues)
+    load_start = time.perf_counter()
+    translator = Translator(model_name=options["translator_model"])
+    load_seconds = time.perf_counter() - load_start
+    start = time.perf_counter()
+    translator.translate_segments(segments, "en", "es", True)
+    latency = time.perf_counter() - start
+    return {"input": f"{num_cues}_cues", "latency_s": latency, "load_s": load_seconds, "items": {"segments": num_cues}}
+
+
+def _case_subtitles(options, num_cues):
+    from benchmarks.fixtures import synthetic_segments
+    from src.subtitle_generator import SubtitleGenerator
+
+    segments = synthetic_segments(num_cues)
+    subtitle_generator = SubtitleGenerator()
+    output_dir = subtitle_generator.make_output_dir()
+    start = time.perf_counter()
+    subtitle_generator.create_srt_file(f"bench_{num_cues}", segments, output_dir)
+    latency = time.perf_counter() - start
+    shutil.rmtree(output_dir)
+    return {"input": f"{num_cues}_cues", "latency_s": latency, "items": {"cues": num_cues}}
+
+
+CASES = {
+    "audio_decode": _case_audio_decode,
+    "noise_reduction": _case_noise_reduction,
+    "transcribe": _case_transcribe,
+    "translate": _case_translate,
+    "subtitles": _case_subtitles,
+}
+
+
+def _run_case(stage, options, args):
+    """Child-process entry point: runs one case and adds throughput and peak RSS."""
+    os.environ["HF_HUB_OFFLINE"] = "1"
+    os.environ["TRANSFORMERS_OFFLINE"] = "1"
+    result = CASES[stage](options, *args)
+    result["stage"] = stage
+    result["throughput"] = {f"{key}_per_second": value / result["latency_s"] for key, value in result["items"].items() if result["latency_s"] > 0}
+    result["peak_rss_mb"] = _peak_rss_mb()
+    return result
+
+
+def run_isolated(stage, options, args):
+    """Runs a case in a fresh spawned process; failures are reported instead of aborting the suite."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        try:
+            return pool.apply(_run_case, (stage, options, args))
+        except Exception as e:
+            return {"stage": stage, "input": "/".join(map(str, args)), "error": f"{type(e).__name__}: {e}"}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Prints latency changes against a baseline run.
+
+    Returns:
+        list: The (stage, input) pairs that got slower by more than `tolerance`.
+    """
+    previous = {(r["stage"], r["input"]): r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    print(f"\n{'stage':<16} {'input':<22} {'baseline (s)':>12} {'current (s)':>12} {'change':>8}")
+    for r in results:
+        key = (r["stage"], r["input"])
+        if "error" in r or key not in previous:
+            continue
+        old, new = previous[key]["latency_s"], r["latency_s"]
+        change = (new - old) / old if old > 0 else 0.0
+        flag = "  <-- regression" if change > tolerance else ""
+        print(f"{r['stage']:<16} {r['input']:<22} {old:>12.3f} {new:>12.3f} {change:>+8.1%}{flag}")
+        if change > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the pipeline benchmark suite.")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--durations", type=float, nargs="+", default=[1, 10, 60], help="Audio fixture lengths in minutes.")
+    parser.add_argument("--kinds", nargs="+", choices=["tone", "noise", "speech"], default=["speech"], help="Audio fixture types.")
+    parser.add_argument("--cues", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Synthetic transcript sizes.")
+    parser.add_argument("--whisper-model", default="tiny")
+    parser.add_argument("--translator-model", help="Local or cached mBART-50-compatible model. Translation is skipped without it.")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="A previous results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed latency increase before a case counts as a regression.")
+    args = parser.parse_args()
+
+    options = {"whisper_model": args.whisper_model, "translator_model": args.translator_model}
+    cases = []
+    for stage in args.stages:
+        if stage in ("audio_decode", "noise_reduction", "transcribe"):
+            cases += [(stage, (kind, minutes)) for kind in args.kinds for minutes in args.durations]
+        elif stage == "translate":
+            if not args.translator_model:
+                print("Skipping translate: pass --translator-model to benchmark translation.")
+                continue
+            cases += [(stage, (num_cues,)) for num_cues in args.cues]
+        else:
+            cases += [(stage, (num_cues,)) for num_cues in args.cues]
+
+    results = []
+    for stage, case_args in cases:
+        print(f"Running {stage} {case_args}...")
+        result = run_isolated(stage, options, case_args)
+        if "error" in result:
+            print(f"  failed: {result['error']}")
+        else:
+            rates = ", ".join(f"{k}={v:.1f}" for k, v in result["throughput"].items())
+            print(f"  {result['latency_s']:.3f}s, peak RSS {result['peak_rss_mb']:.0f} MB, {rates}")
+        results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": time.time(),
+            "git_commit": _git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "options": options,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.tolerance:.0%}.")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,35 @@
 # src/audio_processor.py (Heavily Modified)
 
 import os
+import re
+import shutil
+import subprocess
 import tempfile
 import yt_dlp
-from moviepy.editor import VideoFileClip
-import librosa
 import numpy as np
 import soundfile as sf
 import noisereduce as nr
+import ffmpeg
+
+# Whisper models expect 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# noisereduce's default STFT hop (n_fft=1024, hop = win_length // 4)
+NOISE_REDUCE_HOP_LENGTH = 256
+
+# The container duration ffmpeg prints when it opens an input, e.g. "Duration: 00:12:34.56"
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+def ffmpeg_binary():
+    """
+    Returns the ffmpeg executable to run: a system ffmpeg on PATH if there is one,
+    otherwise the binary bundled with imageio-ffmpeg (installed with moviepy).
+    """
+    system_ffmpeg = shutil.which("ffmpeg")
+    if system_ffmpeg:
+        return system_ffmpeg
+    import imageio_ffmpeg
+    return imageio_ffmpeg.get_ffmpeg_exe()
 
 class AudioProcessor:
     def __init__(self):
@@ -45,6 +67,10 @@ class AudioProcessor:
         """
         A simplified function that handles only uploaded video files.
         """
+        # moviepy and librosa are only needed by this file-based path, so they are imported lazily
+        from moviepy.editor import VideoFileClip
+        import librosa
+
         print(f"Extracting audio from video: {source_path}")
         video = VideoFileClip(source_path)
         temp_audio_path = tempfile.mktemp(suffix='.wav')
@@ -68,3 +94,231 @@ class AudioProcessor:
         os.remove(temp_audio_path)
             
         return processed_audio_path
+
+    def load_audio_array(self, source_path, duration_limit=None, sr=SAMPLE_RATE):
+        """
+        Decodes the audio track of a video/audio file straight into memory.
+
+        ffmpeg downmixes and resamples the stream and writes raw float32 samples to a
+        pipe, so no intermediate WAV file is created.
+
+        Args:
+            source_path (str): The path to the uploaded video or audio file.
+            duration_limit (float, optional): Only decode the first N seconds.
+            sr (int): The target sample rate.
+
+        Returns:
+            np.ndarray: A mono float32 waveform sampled at `sr`.
+        """
+        print(f"Decoding audio in memory from: {source_path}")
+        output_kwargs = {"format": "f32le", "acodec": "pcm_f32le", "ac": 1, "ar": sr}
+        if duration_limit:
+            output_kwargs["t"] = duration_limit
+        try:
+            out, _ = (
+                ffmpeg
+                .input(source_path)
+                .output("pipe:", vn=None, **output_kwargs)
+                .run(cmd=[ffmpeg_binary(), "-nostdin"], capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            raise IOError(f"Failed to decode audio from {source_path}: {e.stderr.decode(errors='ignore')}")
+        return np.frombuffer(out, dtype=np.float32)
+
+    def process_video_or_audio_to_array(self, source_path, apply_noise_reduction, duration_limit=None):
+        """
+        In-memory counterpart of `process_video_or_audio`.
+
+        Returns:
+            np.ndarray: The (optionally denoised) 16 kHz mono float32 waveform, ready to be
+            passed directly to `Transcriber.transcribe_audio`.
+        """
+        y = self.load_audio_array(source_path, duration_limit)
+
+        if apply_noise_reduction and y.size:
+            print("Applying noise reduction...")
+            y = nr.reduce_noise(y=y, sr=SAMPLE_RATE).astype(np.float32, copy=False)
+
+        return y
+
+    def probe_duration(self, source_path):
+        """
+        Reads a file's duration from its container header, without decoding any audio.
+
+        Returns:
+            float or None: The duration in seconds, or None if the container doesn't state one.
+        """
+        # With no output file ffmpeg exits with an error after printing the input's header
+        result = subprocess.run([ffmpeg_binary(), "-nostdin", "-hide_banner", "-i", source_path], capture_output=True, text=True, errors="ignore")
+        match = DURATION_PATTERN.search(result.stderr)
+        if not match:
+            return None
+        hours, minutes, seconds = match.groups()
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    def stream_audio_chunks(self, source_path, chunk_seconds=30.0, duration_limit=None, sr=SAMPLE_RATE):
+        """
+        Decodes the audio track of a file incrementally, yielding fixed-size chunks.
+
+        Only one chunk is held in memory at a time, however long the input is.
+
+        Args:
+            source_path (str): The path to the uploaded video or audio file.
+            chunk_seconds (float): Length of each yielded chunk (the last one may be shorter).
+            duration_limit (float, optional): Only decode the first N seconds.
+            sr (int): The target sample rate.
+
+        Yields:
+            np.ndarray: Mono float32 chunks sampled at `sr`.
+        """
+        output_kwargs = {"format": "f32le", "acodec": "pcm_f32le", "ac": 1, "ar": sr}
+        if duration_limit:
+            output_kwargs["t"] = duration_limit
+        process = (
+            ffmpeg
+            .input(source_path)
+            .output("pipe:", vn=None, **output_kwargs)
+            .run_async(cmd=[ffmpeg_binary(), "-nostdin", "-loglevel", "error"], pipe_stdout=True)
+        )
+        chunk_bytes = int(chunk_seconds * sr) * 4
+        try:
+            while True:
+                data = process.stdout.read(chunk_bytes)
+                if not data:
+                    break
+                # A read can end on a partial sample at EOF; drop the incomplete bytes
+                yield np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+        finally:
+            # Also runs when the consumer stops early, so ffmpeg never outlives the generator
+            process.stdout.close()
+            returncode = process.wait()
+        if returncode != 0:
+            raise IOError(f"Failed to decode audio from {source_path}")
+
+    def denoise_stream(self, chunks, sr=SAMPLE_RATE, overlap_seconds=5.0, crossfade_seconds=0.5, stationary=False, noise_profile_seconds=2.0):
+        """
+        Applies noise reduction chunk by chunk with bounded memory.
+
+        Each chunk is denoised together with `overlap_seconds` of raw context from its
+        neighbours (one chunk of lookahead is buffered), so the smoothed noise estimate
+        near the chunk edges matches the whole-file result. Neighbouring outputs are
+        then joined by overlap-add with complementary linear ramps over
+        `crossfade_seconds`, so there are no seams.
+
+        Args:
+            chunks (iterable): Mono float32 chunks, e.g. from `stream_audio_chunks`.
+            sr (int): The sample rate of the chunks.
+            overlap_seconds (float): Raw context added on each side of a chunk before denoising.
+            crossfade_seconds (float): Length of the cross-faded region between chunks.
+            stationary (bool): If True, a noise profile is estimated once from the first
+                `noise_profile_seconds` of audio and reused for every chunk. Otherwise
+                noisereduce's non-stationary gate adapts slowly over time, as it does
+                for the whole-file path.
+            noise_profile_seconds (float): Length of the clip used for the stationary profile.
+
+        Yields:
+            np.ndarray: Denoised float32 chunks that concatenate to the full signal.
+        """
+        context = int(overlap_seconds * sr)
+        crossfade = min(int(crossfade_seconds * sr), context)
+        fade_in = np.linspace(0.0, 1.0, crossfade, endpoint=False, dtype=np.float32)
+        fade_out = 1.0 - fade_in
+        empty = np.zeros(0, dtype=np.float32)
+
+        noise_clip = None
+        history = empty
+        position = 0
+        pending_tail = None
+        chunk_iter = self._merge_short_last_chunk(chunks, max(context, 2 * crossfade))
+        current = next(chunk_iter, None)
+        while current is not None:
+            following = next(chunk_iter, None)
+            if stationary and noise_clip is None:
+                noise_clip = current[:int(noise_profile_seconds * sr)]
+
+            # Start each window on the STFT frame grid of the whole signal, otherwise
+            # the chunked spectrogram frames no longer line up with the whole-file ones
+            left_size = min(position, context + (position - context) % NOISE_REDUCE_HOP_LENGTH)
+            left_context = history[history.size - left_size:] if left_size else empty
+            right_context = following[:context] if following is not None else empty
+            window = np.concatenate([left_context, current, right_context])
+            denoised = nr.reduce_noise(y=window, sr=sr, stationary=stationary, y_noise=noise_clip).astype(np.float32, copy=False)
+
+            # Keep this chunk's span, plus the cross-fade region before it for all but the first chunk
+            keep_start = left_context.size - (crossfade if pending_tail is not None else 0)
+            keep = denoised[keep_start:left_context.size + current.size]
+
+            if pending_tail is not None:
+                blended = pending_tail * fade_out + keep[:crossfade] * fade_in
+                keep = np.concatenate([blended, keep[crossfade:]])
+            split = max(0, keep.size - crossfade)
+            if split:
+                yield keep[:split]
+            pending_tail = keep[split:]
+
+            history = np.concatenate([history, current])[-(context + NOISE_REDUCE_HOP_LENGTH):]
+            position += current.size
+            current = following
+
+        if pending_tail is not None and pending_tail.size:
+            yield pending_tail
+
+    @staticmethod
+    def _merge_short_last_chunk(chunks, min_samples):
+        """Yields chunks unchanged, except that a final chunk shorter than `min_samples` is appended to the one before it."""
+        previous = None
+        for chunk in chunks:
+            if previous is not None:
+                if chunk.size < min_samples:
+                    previous = np.concatenate([previous, chunk])
+                    continue
+                yield previous
+            previous = chunk
+        if previous is not None:
+            yield previous
+
+    def process_video_or_audio_streaming(self, source_path, apply_noise_reduction, duration_limit=None, chunk_seconds=30.0, overlap_seconds=5.0, stationary=False):
+        """
+        Streaming counterpart of `process_video_or_audio_to_array` for long inputs.
+
+        Memory use is proportional to `chunk_seconds` rather than to the input length.
+
+        Yields:
+            np.ndarray: Consecutive 16 kHz mono float32 chunks of the (optionally denoised) audio.
+        """
+        if chunk_seconds <= overlap_seconds:
+            raise ValueError("chunk_seconds must be longer than overlap_seconds.")
+
+        print(f"Streaming audio from: {source_path}")
+        chunks = self.stream_audio_chunks(source_path, chunk_seconds, duration_limit)
+        if apply_noise_reduction:
+            print("Applying streaming noise reduction...")
+            chunks = self.denoise_stream(chunks, overlap_seconds=overlap_seconds, stationary=stationary)
+        yield from chunks
+
+    def process_video_or_audio_streaming_to_array(self, source_path, apply_noise_reduction, duration_limit=None, **stream_options):
+        """
+        Runs `process_video_or_audio_streaming` and gathers the chunks into one waveform.
+
+        The output array is allocated once, sized from the container's duration, and the
+        chunks are copied into it as they arrive. Peak memory stays at about one copy of
+        the waveform plus a chunk, instead of the chunk list plus its concatenation.
+
+        Returns:
+            np.ndarray: The (optionally denoised) 16 kHz mono float32 waveform.
+        """
+        expected_seconds = self.probe_duration(source_path)
+        if duration_limit:
+            expected_seconds = min(expected_seconds or duration_limit, duration_limit)
+        # One second of slack absorbs rounding in the stated duration
+        audio = np.empty(int((expected_seconds or 600.0) * SAMPLE_RATE) + SAMPLE_RATE, dtype=np.float32)
+        filled = 0
+        for chunk in self.process_video_or_audio_streaming(source_path, apply_noise_reduction, duration_limit, **stream_options):
+            if filled + chunk.size > audio.size:
+                # The duration was missing or understated: grow geometrically
+                grown = np.empty(max(2 * audio.size, filled + chunk.size), dtype=np.float32)
+                grown[:filled] = audio[:filled]
+                audio = grown
+            audio[filled:filled + chunk.size] = chunk
+            filled += chunk.size
+        return audio[:filled]
@@ -0,0 +1,96 @@
+# src/job_scheduler.py
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class JobScheduler:
+    def __init__(self, stage_limits, compute_weights=None, total_threads=None):
+        """
+        Runs pipeline stages on separate bounded worker pools.
+
+        Each stage (e.g. "audio", "whisper", "translate") gets its own pool, so one job's
+        audio extraction can overlap another job's transcription while no stage runs
+        more than its limit of tasks at once.
+
+        Args:
+            stage_limits (dict): Maximum concurrent tasks per stage, e.g. {"audio": 2, "whisper": 1}.
+            compute_weights (dict, optional): Relative share of the CPU thread budget per
+                compute-bound stage, e.g. {"whisper": 1, "translate": 1}. Stages not listed
+                here (such as ffmpeg-bound audio extraction) are budgeted one thread per worker.
+            total_threads (int, optional): The CPU thread budget. Defaults to the number of cores.
+        """
+        self.stage_limits = dict(stage_limits)
+        self.compute_weights = dict(compute_weights or {})
+        self.total_threads = total_threads or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._queued = {stage: 0 for stage in stage_limits}
+        self._running = {stage: 0 for stage in stage_limits}
+        self._completed = {stage: 0 for stage in stage_limits}
+        self._pools = {
+            stage: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{stage}-stage")
+            for stage, limit in stage_limits.items()
+        }
+
+    def threads_per_worker(self, stage):
+        """
+        Returns how many CPU threads each worker of `stage` may use so that, with every
+        pool busy, the stages together don't oversubscribe the thread budget.
+        """
+        if stage not in self.compute_weights:
+            return 1
+        reserved = sum(limit for name, limit in self.stage_limits.items() if name not in self.compute_weights)
+        available = max(1, self.total_threads - reserved)
+        share = available * self.compute_weights[stage] / sum(self.compute_weights.values())
+        return max(1, int(share // self.stage_limits[stage]))
+
+    def submit(self, stage, fn, *args, **kwargs):
+        """
+        Queues `fn(*args, **kwargs)` on the pool for `stage`.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's return value.
+        """
+        with self._lock:
+            self._queued[stage] += 1
+
+        def run():
+            with self._lock:
+                self._queued[stage] -= 1
+                self._running[stage] += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running[stage] -= 1
+                    self._completed[stage] += 1
+
+        return self._pools[stage].submit(run)
+
+    def run(self, stage, fn, *args, **kwargs):
+        """Like `submit`, but blocks until the task has finished and returns its result."""
+        return self.submit(stage, fn, *args, **kwargs).result()
+
+    def queue_depth(self):
+        """Returns the number of queued, running and completed tasks for each stage."""
+        with self._lock:
+            return {
+                stage: {
+                    "queued": self._queued[stage],
+                    "running": self._running[stage],
+                    "completed": self._completed[stage],
+                    "limit": self.stage_limits[stage],
+                }
+                for stage in self.stage_limits
+            }
+
+    def format_queue_depth(self):
+        """A one-line-per-stage, human-readable summary of `queue_depth`."""
+        return "\n".join(
+            f"{stage}: {d['running']}/{d['limit']} running, {d['queued']} queued, {d['completed']} done"
+            for stage, d in self.queue_depth().items()
+        )
+
+    def shutdown(self, wait=True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
@@ -0,0 +1,253 @@
+# src/metrics.py
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+def current_rss_mb():
+    """Returns the resident set size of this process in MB, or None if it can't be read."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+class _RssSampler:
+    """Polls the process RSS on a background thread and keeps the maximum seen."""
+
+    def __init__(self, interval_seconds=0.05):
+        self.interval_seconds = interval_seconds
+        self.peak_mb = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            rss = current_rss_mb()
+            if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+                self.peak_mb = rss
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        rss = current_rss_mb()
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+class StageRecord:
+    def __init__(self, name):
+        """
+        Accumulated measurements for one pipeline stage of a job.
+
+        A stage can run several times within a job (e.g. one translation micro-batch per
+        call); wall and CPU time are summed and the peak RSS is the maximum over all runs.
+        """
+        self.name = name
+        self.calls = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_mb = None
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        """Adds throughput counters, e.g. `add(segments=8, tokens=412)` or `add(audio_seconds=60.0)`."""
+        with self._lock:
+            for key, value in counts.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+    def _record_run(self, wall_seconds, cpu_seconds, peak_rss_mb):
+        with self._lock:
+            self.calls += 1
+            self.wall_seconds += wall_seconds
+            self.cpu_seconds += cpu_seconds
+            if peak_rss_mb is not None and (self.peak_rss_mb is None or peak_rss_mb > self.peak_rss_mb):
+                self.peak_rss_mb = peak_rss_mb
+
+    def to_dict(self):
+        with self._lock:
+            result = {
+                "calls": self.calls,
+                "wall_seconds": round(self.wall_seconds, 4),
+                "cpu_seconds": round(self.cpu_seconds, 4),
+                "peak_rss_mb": round(self.peak_rss_mb, 1) if self.peak_rss_mb is not None else None,
+                "counters": dict(self.counters),
+            }
+            # Throughput figures: audio-seconds per second, segments per second, tokens per second
+            if self.wall_seconds > 0:
+                result["throughput"] = {
+                    f"{key}_per_second": round(value / self.wall_seconds, 3)
+                    for key, value in self.counters.items()
+                }
+            return result
+
+class JobMetrics:
+    def __init__(self, job_id=None, profile=False):
+        """
+        Collects per-stage wall time, CPU time, peak memory and throughput for a single job.
+
+        CPU time is measured with `time.process_time()`, which covers every thread in the
+        process (including CTranslate2/torch worker threads). When several jobs run at
+        once, their CPU figures therefore overlap.
+
+        Args:
+            job_id (str, optional): Identifier used in file names. A random one is generated if omitted.
+            profile (bool): Run every stage under cProfile. Stages run on different threads
+                            (cProfile only follows the thread it was enabled on), so each run is
+                            profiled separately and the merged stats are written next to the JSON
+                            log, ready for pstats or snakeviz.
+        """
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self.stages = {}
+        self.profile = profile
+        self._profiles = []
+        self._lock = threading.Lock()
+
+    def get_stage(self, name):
+        with self._lock:
+            if name not in self.stages:
+                self.stages[name] = StageRecord(name)
+            return self.stages[name]
+
+    @contextmanager
+    def stage(self, name, sample_memory=True):
+        """
+        Times a block of work as one run of stage `name`.
+
+        Args:
+            name (str): The stage name (e.g. "audio", "transcribe", "translate").
+            sample_memory (bool): Poll RSS on a background thread for the peak during the run.
+                                  Turn off for very short, frequent blocks; the RSS at exit is used instead.
+
+        Yields:
+            StageRecord: Call `.add(...)` on it to record throughput counters.
+        """
+        record = self.get_stage(name)
+        profiler = cProfile.Profile() if self.profile else None
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+ allows one active profiler per process; a stage that overlaps
+                # another profiled stage (e.g. translate and subtitles) goes unprofiled
+                print(f"Skipping profiling of stage '{name}': another profiler is active.")
+                profiler = None
+        try:
+            if sample_memory:
+                with _RssSampler() as sampler:
+                    yield record
+                peak_rss_mb = sampler.peak_mb
+            else:
+                yield record
+                peak_rss_mb = current_rss_mb()
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                with self._lock:
+                    self._profiles.append(profiler)
+        record._record_run(time.perf_counter() - wall_start, time.process_time() - cpu_start, peak_rss_mb)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "started_at": self.started_at,
+            "stages": {name: record.to_dict() for name, record in self.stages.items()},
+        }
+
+    def finish(self, log_dir):
+        """
+        Writes the job's JSON log, plus the merged cProfile stats if profiling was enabled.
+
+        Returns:
+            str: The path of the JSON log.
+        """
+        os.makedirs(log_dir, exist_ok=True)
+        data = self.to_dict()
+        with self._lock:
+            profiles, self._profiles = self._profiles, []
+        if profiles:
+            profile_path = os.path.join(log_dir, f"job_{self.job_id}.prof")
+            pstats.Stats(*profiles).dump_stats(profile_path)
+            data["profile_path"] = profile_path
+        json_path = os.path.join(log_dir, f"job_{self.job_id}.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        print(f"Job metrics written to: {json_path}")
+        return json_path
+
+class MetricsCollector:
+    def __init__(self, prometheus_path=None, prefix="global_sound"):
+        """
+        Aggregates finished jobs into process-wide totals, exported in the Prometheus text format.
+
+        Args:
+            prometheus_path (str, optional): File rewritten after every job, suitable for
+                                             node_exporter's textfile collector.
+            prefix (str): Metric name prefix.
+        """
+        self.prometheus_path = prometheus_path
+        self.prefix = prefix
+        self.jobs = 0
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record_job(self, job_metrics):
+        with self._lock:
+            self.jobs += 1
+            for name, record in job_metrics.stages.items():
+                stage = record.to_dict()
+                totals = self._totals.setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": 0.0, "counters": {}})
+                totals["calls"] += stage["calls"]
+                totals["wall_seconds"] += stage["wall_seconds"]
+                totals["cpu_seconds"] += stage["cpu_seconds"]
+                totals["peak_rss_mb"] = max(totals["peak_rss_mb"], stage["peak_rss_mb"] or 0.0)
+                for key, value in stage["counters"].items():
+                    totals["counters"][key] = totals["counters"].get(key, 0) + value
+        if self.prometheus_path:
+            self.write_prometheus(self.prometheus_path)
+
+    def to_prometheus(self):
+        """Renders the aggregated totals in the Prometheus text exposition format."""
+        p = self.prefix
+        lines = [f"# TYPE {p}_jobs_total counter", f"{p}_jobs_total {self.jobs}"]
+        families = [
+            ("stage_calls_total", "counter", lambda t: t["calls"]),
+            ("stage_wall_seconds_total", "counter", lambda t: f"{t['wall_seconds']:.6f}"),
+            ("stage_cpu_seconds_total", "counter", lambda t: f"{t['cpu_seconds']:.6f}"),
+            ("stage_peak_rss_bytes", "gauge", lambda t: int(t["peak_rss_mb"] * 1024 * 1024)),
+        ]
+        with self._lock:
+            stages = sorted(self._totals.items())
+            # Every sample of a metric family has to follow its TYPE line without interruption
+            for family, metric_type, value in families:
+                lines.append(f"# TYPE {p}_{family} {metric_type}")
+                for name, totals in stages:
+                    lines.append(f'{p}_{family}{{stage="{name}"}} {value(totals)}')
+            lines.append(f"# TYPE {p}_stage_items_total counter")
+            for name, totals in stages:
+                for key, count in sorted(totals["counters"].items()):
+                    lines.append(f'{p}_stage_items_total{{stage="{name}",kind="{key}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomically rewrites `path` so scrapers never read a partial file."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
@@ -0,0 +1,145 @@
+# src/model_registry.py
+
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+from src.metrics import current_rss_mb
+
+class _ModelEntry:
+    def __init__(self, factory):
+        self.factory = factory
+        self.instance = None
+        self.lock = threading.RLock()
+        self.in_use = 0
+        self.last_used = 0.0
+        self.load_seconds = None
+        self.resident_mb = None
+
+class ModelRegistry:
+    def __init__(self, idle_ttl_seconds=None):
+        """
+        Loads models on first use and optionally unloads them again after a period of inactivity.
+
+        Args:
+            idle_ttl_seconds (float, optional): Unload a model once it has been idle for this long.
+                                                None keeps loaded models for the lifetime of the process.
+        """
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._entries = {}
+        self._stop = threading.Event()
+        self._reaper = None
+        if idle_ttl_seconds:
+            self._reaper = threading.Thread(target=self._reap_idle_models, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+    def register(self, name, factory):
+        """
+        Registers a model without loading it.
+
+        Args:
+            name (str): The key used to look the model up (e.g., "translator").
+            factory (callable): Builds the model; called on first use.
+        """
+        self._entries[name] = _ModelEntry(factory)
+
+    def get(self, name):
+        """Returns the model, loading it first if needed. Safe to call from several threads."""
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.instance is None:
+                print(f"Loading model '{name}'...")
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                entry.instance = entry.factory()
+                entry.load_seconds = time.perf_counter() - start
+                rss_after = current_rss_mb()
+                if rss_before is not None and rss_after is not None:
+                    entry.resident_mb = rss_after - rss_before
+                size = f", ~{entry.resident_mb:.0f} MB resident" if entry.resident_mb is not None else ""
+                print(f"Model '{name}' loaded in {entry.load_seconds:.1f}s{size}.")
+            entry.last_used = time.monotonic()
+            return entry.instance
+
+    @contextmanager
+    def use(self, name):
+        """
+        Context manager around `get` that keeps the model from being unloaded while in use.
+
+        Usage:
+            with registry.use("translator") as translator:
+                translator.translate_segments(...)
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            instance = self.get(name)
+            entry.in_use += 1
+        try:
+            yield instance
+        finally:
+            with entry.lock:
+                entry.in_use -= 1
+                entry.last_used = time.monotonic()
+
+    def preload(self, names):
+        """Starts loading the given models in a background thread and returns immediately."""
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Background loading of model '{name}' failed: {e}")
+
+        thread = threading.Thread(target=load_all, name="model-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def unload(self, name, min_idle_seconds=None):
+        """
+        Drops a loaded model so its memory can be reclaimed. Models currently in use are kept.
+
+        Args:
+            name (str): The registered model name.
+            min_idle_seconds (float, optional): Only unload if the model has been idle at least this long.
+
+        Returns:
+            bool: Whether the model was unloaded.
+        """
+        entry = self._entries[name]
+        with entry.lock:
+            if entry.instance is None or entry.in_use:
+                return False
+            if min_idle_seconds is not None and time.monotonic() - entry.last_used < min_idle_seconds:
+                return False
+            instance, entry.instance = entry.instance, None
+        if hasattr(instance, "close"):
+            instance.close()
+        del instance
+        gc.collect()
+        print(f"Model '{name}' unloaded.")
+        return True
+
+    def _reap_idle_models(self):
+        interval = min(self.idle_ttl_seconds / 4, 60)
+        while not self._stop.wait(interval):
+            for name in self._entries:
+                self.unload(name, min_idle_seconds=self.idle_ttl_seconds)
+
+    def stats(self):
+        """Returns load state, load time and resident size for every registered model."""
+        return {
+            name: {
+                "loaded": entry.instance is not None,
+                "in_use": entry.in_use,
+                "load_seconds": entry.load_seconds,
+                "resident_mb": entry.resident_mb,
+            }
+            for name, entry in self._entries.items()
+        }
+
+    def close(self):
+        """Stops the idle reaper and unloads every model."""
+        self._stop.set()
+        for name in self._entries:
+            self.unload(name)
@@ -0,0 +1,169 @@
+# src/resegmenter.py
+
+import math
+import re
+
+# A sentence ends at . ! ? (or their CJK forms) followed by whitespace or the end of the text
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?。！？])\s+')
+CLAUSE_BOUNDARY = re.compile(r'(?<=[,;:，；：])\s+')
+
+class Resegmenter:
+    def __init__(self, max_unit_chars=200, max_merge_gap=1.0, max_cue_seconds=7.0, max_line_chars=42, max_lines=2):
+        """
+        Reshapes Whisper segments into uniform translation units, and translated units
+        back into subtitle cues.
+
+        Whisper emits anything from one-word fragments to paragraph-long segments. Short
+        fragments each cost a decoder call and lack context; long ones inflate the padding
+        of their whole batch. `merge_for_translation` evens them out, and `to_cues` splits
+        the translated text into readable cues with their share of the time span.
+
+        Args:
+            max_unit_chars (int): Character budget of one translation unit (~4 chars per token).
+            max_merge_gap (float): Segments further apart than this (in seconds) are never merged.
+            max_cue_seconds (float): Longest time a single cue stays on screen.
+            max_line_chars (int): Longest subtitle line.
+            max_lines (int): Most lines in one cue.
+        """
+        self.max_unit_chars = max_unit_chars
+        self.max_merge_gap = max_merge_gap
+        self.max_cue_seconds = max_cue_seconds
+        self.max_line_chars = max_line_chars
+        self.max_lines = max_lines
+
+    def merge_for_translation(self, segments):
+        """
+        Merges adjacent short segments and splits long ones on sentence boundaries.
+
+        Args:
+            segments (list): Segment dictionaries with 'start', 'end', and 'text', in time order.
+
+        Returns:
+            list: Translation units in the same {'start', 'end', 'text'} shape.
+        """
+        units = []
+        for segment in segments:
+            text = " ".join(segment['text'].split())
+            if not text:
+                continue
+            for piece in self._split_long(segment['start'], segment['end'], text):
+                previous = units[-1] if units else None
+                if (previous is not None
+                        and piece['start'] - previous['end'] <= self.max_merge_gap
+                        and len(previous['text']) + 1 + len(piece['text']) <= self.max_unit_chars):
+                    previous['end'] = piece['end']
+                    previous['text'] = f"{previous['text']} {piece['text']}"
+                else:
+                    units.append(piece)
+        return units
+
+    def to_cues(self, segments):
+        """
+        Splits (translated) segments into subtitle cues that respect the duration and
+        line-length limits. Each cue gets a share of its segment's time span proportional
+        to its length.
+
+        Long spans are split at sentence and clause boundaries only; text is cut between
+        words just to fit the line limits. A cue whose share of the span is still longer
+        than `max_cue_seconds` ends early instead.
+
+        Returns:
+            list: Cue dictionaries with 'start', 'end', and 'text' (lines joined by newlines).
+        """
+        max_cue_chars = self.max_line_chars * self.max_lines
+        cues = []
+        for segment in segments:
+            text = " ".join(segment['text'].split())
+            if not text:
+                continue
+            duration = max(segment['end'] - segment['start'], 0.0)
+            cues_for_duration = max(1, math.ceil(duration / self.max_cue_seconds))
+            target_chars = min(max_cue_chars, math.ceil(len(text) / cues_for_duration))
+            # Whole sentences, then whole clauses, are kept together when they fit, so cues break at punctuation
+            tokens = []
+            for sentence in SENTENCE_BOUNDARY.split(text):
+                if len(sentence) <= target_chars and self._fits_cue(sentence):
+                    tokens.append(sentence)
+                    continue
+                for clause in CLAUSE_BOUNDARY.split(sentence):
+                    tokens.extend([clause] if len(clause) <= max_cue_chars and self._fits_cue(clause) else self._words(clause))
+            pieces = self._pack_words(tokens, target_chars, self.max_lines)
+            for (start, end), piece in zip(self._share_time(segment['start'], segment['end'], pieces), pieces):
+                cues.append({"start": start, "end": min(end, start + self.max_cue_seconds), "text": "\n".join(self._wrap(piece))})
+        return cues
+
+    def _fits_cue(self, text):
+        return len(self._wrap(text)) <= self.max_lines
+
+    def _split_long(self, start, end, text):
+        """Splits a segment longer than the unit budget, first on sentences, then on clauses, then on words."""
+        if len(text) <= self.max_unit_chars:
+            return [{"start": start, "end": end, "text": text}]
+        pieces = []
+        for sentence in SENTENCE_BOUNDARY.split(text):
+            if len(sentence) <= self.max_unit_chars:
+                pieces.append(sentence)
+                continue
+            for clause in CLAUSE_BOUNDARY.split(sentence):
+                if len(clause) <= self.max_unit_chars:
+                    pieces.append(clause)
+                else:
+                    pieces.extend(self._pack_words(self._words(clause), self.max_unit_chars))
+        # Re-pack so neighbouring short sentences still share a unit
+        pieces = self._pack_words(pieces, self.max_unit_chars)
+        return [
+            {"start": piece_start, "end": piece_end, "text": piece}
+            for (piece_start, piece_end), piece in zip(self._share_time(start, end, pieces), pieces)
+        ]
+
+    def _words(self, text):
+        """Splits on whitespace, breaking up unspaced runs (e.g. CJK text) longer than a line."""
+        words = text.split()
+        limit = self.max_line_chars
+        if all(len(word) <= limit for word in words):
+            return words
+        return [word[i:i + limit] for word in words for i in range(0, len(word), limit)]
+
+    def _wrap(self, text):
+        """Greedy line wrapping; simpler and several times faster than textwrap for this case."""
+        lines = []
+        current = ""
+        for word in self._words(text):
+            if current and len(current) + 1 + len(word) > self.max_line_chars:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}" if current else word
+        if current:
+            lines.append(current)
+        return lines
+
+    def _pack_words(self, words, max_chars, max_lines=None):
+        """Greedily joins words (or sentences) into pieces of at most `max_chars`, and at most `max_lines` once wrapped."""
+        pieces = []
+        current = ""
+        for word in words:
+            candidate = f"{current} {word}" if current else word
+            # Wrapping is only checked when the length alone can't rule out an extra line
+            too_many_lines = (max_lines and len(candidate) > self.max_line_chars * (max_lines - 1)
+                              and len(self._wrap(candidate)) > max_lines)
+            if current and (len(candidate) > max_chars or too_many_lines):
+                pieces.append(current)
+                current = word
+            else:
+                current = candidate
+        if current:
+            pieces.append(current)
+        return pieces
+
+    @staticmethod
+    def _share_time(start, end, pieces):
+        """Divides [start, end] between the pieces in proportion to their lengths."""
+        total = sum(len(piece) for piece in pieces) or 1
+        spans = []
+        position = start
+        for i, piece in enumerate(pieces):
+            piece_end = end if i == len(pieces) - 1 else position + (end - start) * len(piece) / total
+            spans.append((position, piece_end))
+            position = piece_end
+        return spans
@@ -1,8 +1,121 @@
 # src/subtitle_generator.py
 
+import gzip
 import os
+import shutil
 import tempfile
-from datetime import timedelta
+import time
+from json.encoder import encode_basestring
+
+SUBTITLE_FORMATS = ("srt", "vtt", "json")
+OUTPUT_DIR_PREFIX = "global_sound_"
+
+def format_timestamp(seconds, separator=","):
+    """
+    Formats seconds as HH:MM:SS,mmm using integer milliseconds.
+
+    Args:
+        seconds (float): The time to format.
+        separator (str): Goes before the milliseconds; ',' for SRT and '.' for WebVTT.
+    """
+    ms = int(seconds * 1000 + 0.5) if seconds > 0 else 0
+    # %-formatting of plain ints is noticeably cheaper than f-string format specs here
+    return "%02d:%02d:%02d%s%03d" % (ms // 3600000, ms // 60000 % 60, ms // 1000 % 60, separator, ms % 1000)
+
+def _format_srt_cue(index, segment):
+    return f"{index}\n{format_timestamp(segment['start'])} --> {format_timestamp(segment['end'])}\n{segment['text']}\n\n"
+
+def _format_vtt_cue(index, segment):
+    return f"{index}\n{format_timestamp(segment['start'], '.')} --> {format_timestamp(segment['end'], '.')}\n{segment['text']}\n\n"
+
+def _format_json_cue(index, segment):
+    # Built by hand: only the text needs JSON escaping, and json.dumps per cue dominates otherwise
+    cue = f'{{"index": {index}, "start": {float(segment["start"])!r}, "end": {float(segment["end"])!r}, "text": {encode_basestring(segment["text"])}}}'
+    # Cues are separated rather than terminated, so the array stays valid JSON
+    return f"  {cue}" if index == 1 else f",\n  {cue}"
+
+# Per format: (file header, cue formatter, file footer)
+_FORMATTERS = {
+    "srt": ("", _format_srt_cue, ""),
+    "vtt": ("WEBVTT\n\n", _format_vtt_cue, ""),
+    "json": ("[\n", _format_json_cue, "\n]\n"),
+}
+
+class SubtitleWriter:
+    def __init__(self, base_path, formats=("srt",), compress=False, buffer_cues=256):
+        """
+        Writes cues to one file per subtitle format, in a single pass over the segments.
+
+        Cues can be appended as they arrive. They are formatted once per format and
+        buffered, so the files receive one bulk write per `buffer_cues` cues.
+
+        Args:
+            base_path (str): Output path without extension (e.g. ".../subtitles_en").
+            formats (iterable): Any of "srt", "vtt" and "json".
+            compress (bool): Gzip each file (adds a ".gz" extension).
+            buffer_cues (int): How many cues to hold in memory before writing them out.
+        """
+        unknown = set(formats) - set(_FORMATTERS)
+        if unknown:
+            raise ValueError(f"Unsupported subtitle format(s): {', '.join(sorted(unknown))}")
+
+        self.paths = {}
+        self.buffer_cues = buffer_cues
+        self._count = 0
+        self._files = {}
+        self._buffers = {}
+        for fmt in formats:
+            path = f"{base_path}.{fmt}" + (".gz" if compress else "")
+            if compress:
+                # Level 6 is gzip's own CLI default: close to level 9's size at a fraction of the time
+                self._files[fmt] = gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+            else:
+                self._files[fmt] = open(path, 'w', encoding='utf-8')
+            self._buffers[fmt] = [_FORMATTERS[fmt][0]]
+            self.paths[fmt] = path
+        self._closed = False
+
+    @property
+    def path(self):
+        """The path of the first requested format, e.g. for the video player."""
+        return next(iter(self.paths.values()))
+
+    def append(self, segment):
+        """Adds a single segment as the next cue."""
+        self._count += 1
+        for fmt, buffer in self._buffers.items():
+            buffer.append(_FORMATTERS[fmt][1](self._count, segment))
+        if self._count % self.buffer_cues == 0:
+            self.flush()
+
+    def extend(self, segments):
+        """Adds several segments as consecutive cues."""
+        for segment in segments:
+            self.append(segment)
+
+    def flush(self):
+        """Writes the buffered cues to disk."""
+        for fmt, buffer in self._buffers.items():
+            if buffer:
+                self._files[fmt].write("".join(buffer))
+                buffer.clear()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        for fmt, buffer in self._buffers.items():
+            buffer.append(_FORMATTERS[fmt][2])
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        print(f"Subtitle files complete ({self._count} cues): {', '.join(self.paths.values())}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
 class SubtitleGenerator:
     def __init__(self):
@@ -10,37 +123,76 @@ class SubtitleGenerator:
 
     def _seconds_to_srt_time(self, seconds):
         """Converts seconds (float) to an SRT time string format HH:MM:SS,ms."""
-        td = timedelta(seconds=seconds)
-        minutes, seconds = divmod(td.seconds, 60)
-        hours, minutes = divmod(minutes, 60)
-        milliseconds = td.microseconds // 1000
-        return f"{hours:02}:{minutes:02}:{seconds:02},{milliseconds:03}"
+        return format_timestamp(seconds)
 
-    def create_srt_file(self, base_filename, segments):
+    def make_output_dir(self):
+        """Creates a fresh directory in the temp dir, so concurrent jobs never share output paths."""
+        return tempfile.mkdtemp(prefix=OUTPUT_DIR_PREFIX)
+
+    def remove_old_output_dirs(self, max_age_seconds):
+        """
+        Deletes the output directories made by `make_output_dir` that are older than
+        `max_age_seconds`, so a long-running server doesn't fill its disk.
+
+        Returns:
+            int: The number of directories removed.
+        """
+        temp_dir = tempfile.gettempdir()
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for name in os.listdir(temp_dir):
+            path = os.path.join(temp_dir, name)
+            if not name.startswith(OUTPUT_DIR_PREFIX) or not os.path.isdir(path):
+                continue
+            try:
+                # Age is measured from the last write, so a long job still writing its files is kept
+                last_write = max([os.path.getmtime(path)] + [entry.stat().st_mtime for entry in os.scandir(path)])
+                if last_write < cutoff:
+                    shutil.rmtree(path)
+                    removed += 1
+            except OSError as e:
+                print(f"Error removing old output directory {path}: {e}")
+        return removed
+
+    def open_stream(self, base_filename, formats=("srt",), output_dir=None, compress=False):
+        """
+        Opens subtitle files for incremental writing.
+
+        Args:
+            base_filename (str): The base name for the output files (e.g., "subtitles_en").
+            formats (iterable): The subtitle formats to write ("srt", "vtt", "json").
+            output_dir (str, optional): Where to write. Defaults to a new per-call directory.
+            compress (bool): Gzip the output files.
+
+        Returns:
+            SubtitleWriter: A writer whose `append(segment)` adds one cue at a time.
+        """
+        output_dir = output_dir or self.make_output_dir()
+        base_path = os.path.join(output_dir, base_filename)
+        print(f"Streaming subtitles to: {base_path} ({', '.join(formats)})")
+        return SubtitleWriter(base_path, formats, compress=compress)
+
+    def create_subtitle_files(self, base_filename, segments, formats=SUBTITLE_FORMATS, output_dir=None, compress=False):
+        """
+        Writes a list of segments in every requested format.
+
+        Returns:
+            dict: The path of each written file, keyed by format.
+        """
+        with self.open_stream(base_filename, formats, output_dir, compress) as writer:
+            writer.extend(segments)
+        return writer.paths
+
+    def create_srt_file(self, base_filename, segments, output_dir=None):
         """
         Creates a .srt subtitle file from a list of transcribed/translated segments.
 
         Args:
             base_filename (str): The base name for the output file (e.g., "subtitles_en").
             segments (list): A list of segment dictionaries with 'start', 'end', and 'text'.
+            output_dir (str, optional): Where to write. Defaults to a new per-call directory.
 
         Returns:
             str: The path to the created .srt file.
         """
-        temp_dir = tempfile.gettempdir()
-        srt_path = os.path.join(temp_dir, f"{base_filename}.srt")
-        
-        print(f"Generating SRT file at: {srt_path}")
-
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            for i, segment in enumerate(segments):
-                start_time = self._seconds_to_srt_time(segment['start'])
-                end_time = self._seconds_to_srt_time(segment['end'])
-                text = segment['text']
-
-                f.write(f"{i + 1}\n")
-                f.write(f"{start_time} --> {end_time}\n")
-                f.write(f"{text}\n\n")
-
-        print("SRT file generation complete.")
-        return srt_path
\ No newline at end of file
+        return self.create_subtitle_files(base_filename, segments, ("srt",), output_dir)["srt"]
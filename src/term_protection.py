@@ -0,0 +1,161 @@
+# src/term_protection.py
+
+import bisect
+import hashlib
+import re
+from collections import deque
+
+# All-caps words (like GAN, CNN) and words mixed with numbers (PyTorch1, 3D, 2024)
+TECHNICAL_TERM_PATTERN = re.compile(r'\b([A-Z]{2,}|[A-Za-z]*[0-9]+[A-Za-z]*)\b')
+
+# Placeholders are bracketed numbers: sentencepiece keeps '[', digits and ']' as ordinary
+# tokens and mBART copies them through, whereas '__TERM0__' is often split or translated.
+# Restoration tolerates the spaces the model sometimes inserts (e.g. '[ 3 ]').
+PLACEHOLDER_FORMAT = "[{}]"
+PLACEHOLDER_PATTERN = re.compile(r'\[\s*(\d+)\s*\]')
+
+# Joins a batch into one string for single-pass matching; never part of a term
+_SEPARATOR = "\x00"
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+class _AhoCorasick:
+    """A trie with failure links, matching every glossary term in a single pass over the text."""
+
+    def __init__(self, terms):
+        self.goto = [{}]
+        self.fail = [0]
+        self.term_length = [0]
+        self.output_link = [0]
+        for term in terms:
+            node = 0
+            for ch in term:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.term_length.append(0)
+                    self.output_link.append(0)
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.term_length[node] = len(term)
+
+        # Breadth-first construction of failure and output links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(ch, 0) if self.goto[fallback].get(ch, 0) != child else 0
+                target = self.fail[child]
+                self.output_link[child] = target if self.term_length[target] else self.output_link[target]
+
+    def find_all(self, text):
+        """Yields (start, end) spans of every occurrence of every term in `text`."""
+        goto, fail, term_length, output_link = self.goto, self.fail, self.term_length, self.output_link
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            match = node if term_length[node] else output_link[node]
+            while match:
+                yield i + 1 - term_length[match], i + 1
+                match = output_link[match]
+
+class TermProtector:
+    def __init__(self, glossary=None):
+        """
+        Replaces technical terms with placeholders before translation and restores them afterwards.
+
+        Terms come from the built-in technical-term pattern and, optionally, from a user
+        glossary of exact phrases. Glossary matching uses an Aho-Corasick automaton, so
+        thousands of terms cost one pass over the text instead of one pass per term.
+
+        Args:
+            glossary (iterable, optional): Domain terms to keep untranslated (e.g. "gradient descent").
+        """
+        terms = sorted({term.strip() for term in (glossary or []) if term and term.strip()})
+        self._automaton = _AhoCorasick(terms) if terms else None
+        # Identifies the glossary in cache keys, since it changes what gets translated
+        self.signature = hashlib.blake2b("\n".join(terms).encode("utf-8"), digest_size=8).hexdigest() if terms else ""
+
+    def _find_spans(self, text):
+        """Returns non-overlapping term spans, preferring the earliest and then the longest match."""
+        candidates = [match.span() for match in TECHNICAL_TERM_PATTERN.finditer(text)]
+        if self._automaton is not None:
+            for start, end in self._automaton.find_all(text):
+                # Glossary terms must match whole words
+                if (start == 0 or not _is_word_char(text[start - 1])) and (end == len(text) or not _is_word_char(text[end])):
+                    candidates.append((start, end))
+        candidates.sort(key=lambda span: (span[0], span[0] - span[1]))
+
+        spans = []
+        last_end = -1
+        for start, end in candidates:
+            if start >= last_end:
+                spans.append((start, end))
+                last_end = end
+        return spans
+
+    def protect_batch(self, texts):
+        """
+        Replaces the terms in every text of a batch with placeholders.
+
+        The whole batch is matched in one pass over a single joined string.
+
+        Returns:
+            tuple: The protected texts and, for each text, the list of original terms
+                   (the placeholder number is the index into that list).
+        """
+        if not texts:
+            return [], []
+        joined = _SEPARATOR.join(text.replace(_SEPARATOR, " ") for text in texts)
+        starts = []
+        position = 0
+        for text in texts:
+            starts.append(position)
+            position += len(text) + 1
+
+        pieces = [[] for _ in texts]
+        terms = [[] for _ in texts]
+        cursors = list(starts)
+        for start, end in self._find_spans(joined):
+            idx = bisect.bisect_right(starts, start) - 1
+            pieces[idx].append(joined[cursors[idx]:start])
+            pieces[idx].append(PLACEHOLDER_FORMAT.format(len(terms[idx])))
+            terms[idx].append(joined[start:end])
+            cursors[idx] = end
+
+        protected = []
+        for idx, text in enumerate(texts):
+            pieces[idx].append(joined[cursors[idx]:starts[idx] + len(text)])
+            protected.append("".join(pieces[idx]))
+        return protected, terms
+
+    def restore_batch(self, texts, terms):
+        """Puts the original terms back in place of their placeholders, in a single pass per text."""
+        restored = []
+        for text, text_terms in zip(texts, terms):
+            if not text_terms:
+                restored.append(text)
+                continue
+
+            def replace(match):
+                index = int(match.group(1))
+                return text_terms[index] if index < len(text_terms) else match.group(0)
+
+            restored.append(PLACEHOLDER_PATTERN.sub(replace, text))
+        return restored
+
+    def protect(self, text):
+        """Single-text convenience wrapper around `protect_batch`."""
+        protected, terms = self.protect_batch([text])
+        return protected[0], terms[0]
+
+    def restore(self, text, terms):
+        """Single-text convenience wrapper around `restore_batch`."""
+        return self.restore_batch([text], [terms])[0]
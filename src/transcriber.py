@@ -1,10 +1,81 @@
 # src/transcriber.py
 
-from faster_whisper import WhisperModel
+from faster_whisper import WhisperModel, decode_audio
+from faster_whisper.transcribe import restore_speech_timestamps
+from faster_whisper.vad import get_speech_timestamps, VadOptions
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
 import os
 
+import numpy as np
+
+from src.transcript_timing import SpeechMap
+
+SAMPLE_RATE = 16000
+
+# Decoding settings shared by the single-pass and the parallel paths.
+# The 'vad_filter=True' argument helps remove long silent parts, improving speed and accuracy.
+DECODE_OPTIONS = {"beam_size": 5, "vad_filter": True}
+# Used where the VAD has already run: only the speech is decoded, and its timestamps are mapped back
+SPEECH_DECODE_OPTIONS = {**DECODE_OPTIONS, "vad_filter": False}
+
+# Each pool worker process holds its own model instance
+_worker_model = None
+
+def _init_worker(model_size, cpu_threads):
+    global _worker_model
+    _worker_model = WhisperModel(model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+def _word_tuples(segment, offset_seconds=0.0):
+    """A segment's words as compact (word, start, end, probability) tuples."""
+    return [
+        (word.word, word.start + offset_seconds, word.end + offset_seconds, word.probability)
+        for word in segment.words or ()
+    ]
+
+def _speech_audio(audio, speech_chunks):
+    """The speech intervals of `audio`, joined into one array (what faster-whisper's VAD filter decodes)."""
+    # Sliced directly rather than with vad.collect_chunks, whose return type changed in
+    # faster-whisper 1.1 (an array before, a list of arrays plus metadata after)
+    if not speech_chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in speech_chunks])
+
+def _speech_in_range(speech_chunks, start, end):
+    """The speech intervals inside samples [start, end), relative to `start`."""
+    return [
+        {"start": max(chunk["start"], start) - start, "end": min(chunk["end"], end) - start}
+        for chunk in speech_chunks if chunk["start"] < end and chunk["end"] > start
+    ]
+
+def _transcribe_chunk(speech_audio, speech_chunks, offset_seconds, language, word_timestamps):
+    """
+    Transcribes one chunk in a pool worker and shifts its timestamps by the chunk offset.
+
+    The parent has already run the VAD: `speech_audio` is only the chunk's speech, and
+    `speech_chunks` (relative to the chunk start) maps its timestamps back.
+
+    Returns:
+        list: (segment dict, word tuples) pairs.
+    """
+    if not speech_chunks:
+        return []
+    segments, _ = _worker_model.transcribe(speech_audio, language=language, word_timestamps=word_timestamps, **SPEECH_DECODE_OPTIONS)
+    segments = restore_speech_timestamps(segments, speech_chunks, SAMPLE_RATE)
+    return [
+        (
+            {
+                "start": segment.start + offset_seconds,
+                "end": segment.end + offset_seconds,
+                "text": segment.text.strip()
+            },
+            _word_tuples(segment, offset_seconds)
+        )
+        for segment in segments
+    ]
+
 class Transcriber:
-    def __init__(self, model_size="base"):
+    def __init__(self, model_size="base", num_workers=1, cpu_threads_per_worker=2, chunk_minutes=5.0, cpu_threads=0, word_timestamps=False):
         """
         Initializes the Transcriber with a specific model size.
         
@@ -12,14 +83,26 @@ class Transcriber:
             model_size (str): The size of the Whisper model to use 
                               (e.g., "tiny", "base", "small", "medium").
                               "base" is a good balance for CPU.
+            num_workers (int): Number of worker processes for parallel transcription.
+                               With 1 (the default), audio is decoded in a single pass.
+            cpu_threads_per_worker (int): CTranslate2 threads used by each worker's model.
+            chunk_minutes (float): Target chunk length when splitting audio for the workers.
+            cpu_threads (int): CTranslate2 threads for the main model (0 lets CTranslate2 decide).
+            word_timestamps (bool): Also align individual words. They are only kept when a
+                `TranscriptTiming` is passed to `stream_segments`.
         """
         # Using a GPU-ready model but it will automatically fall back to CPU if no CUDA is available.
         # For Hugging Face free tier, this will be CPU.
         # We can also specify compute_type="int8" for more speed on CPU.
         self.model_size = model_size
+        self.num_workers = num_workers
+        self.cpu_threads_per_worker = cpu_threads_per_worker
+        self.chunk_minutes = chunk_minutes
+        self.word_timestamps = word_timestamps
+        self._pool = None
         print(f"Loading Whisper model: {self.model_size}...")
         try:
-            self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8")
+            self.model = WhisperModel(self.model_size, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
             print("Whisper model loaded successfully on CPU.")
         except Exception as e:
             print(f"Error loading Whisper model: {e}")
@@ -27,40 +110,183 @@ class Transcriber:
 
     def transcribe_audio(self, audio_path):
         """
-        Transcribes the given audio file into text segments with timestamps.
+        Transcribes the given audio into text segments with timestamps.
 
         Args:
-            audio_path (str): The path to the audio file to transcribe.
+            audio_path (str or np.ndarray): The path to the audio file to transcribe, or a
+                16 kHz mono float32 waveform already decoded in memory.
 
         Returns:
             tuple: A tuple containing:
                 - list: A list of segment dictionaries with 'start', 'end', and 'text'.
                 - str: The detected language code (e.g., 'en', 'es').
         """
-        if not os.path.exists(audio_path):
-            raise FileNotFoundError(f"Audio file not found at {audio_path}")
-
-        print(f"Starting transcription for: {audio_path}")
         try:
-            # The 'vad_filter=True' argument helps remove long silent parts, improving speed and accuracy.
-            segments, info = self.model.transcribe(audio_path, beam_size=5, vad_filter=True)
-            
-            print(f"Detected language '{info.language}' with probability {info.language_probability}")
-
-            # faster-whisper returns a generator, so we convert it to a list of dicts
-            # to match the structure we need.
-            segment_list = []
+            segments, language = self.stream_segments(audio_path)
+            return list(segments), language
+
+        except Exception as e:
+            print(f"An error occurred during transcription: {e}")
+            # Re-raise the exception to be caught by the main app's error handler
+            raise e
+
+    def stream_segments(self, audio_path, timing=None):
+        """
+        Starts transcribing the given audio and returns the segments lazily.
+
+        faster-whisper detects the language up front and then decodes segments on
+        demand, so downstream stages can start working on the first segments while
+        the rest of the audio is still being decoded.
+
+        Args:
+            audio_path (str or np.ndarray): An audio file path or a 16 kHz mono float32 waveform.
+            timing (TranscriptTiming, optional): Receives the audio length, the VAD speech map
+                and, if enabled, the word timestamps, so later stages can use them without touching the audio.
+
+        Returns:
+            tuple: A tuple containing:
+                - generator: Yields segment dictionaries with 'start', 'end', and 'text'.
+                - str: The detected language code (e.g., 'en', 'es').
+        """
+        if isinstance(audio_path, str):
+            if not os.path.exists(audio_path):
+                raise FileNotFoundError(f"Audio file not found at {audio_path}")
+            print(f"Starting transcription for: {audio_path}")
+        else:
+            print(f"Starting transcription for in-memory audio ({len(audio_path) / SAMPLE_RATE:.1f}s)")
+
+        if self.num_workers > 1:
+            return self._stream_segments_parallel(audio_path, timing)
+
+        if timing is not None and DECODE_OPTIONS.get("vad_filter"):
+            segments, info = self._transcribe_with_speech_map(audio_path, timing)
+        else:
+            segments, info = self.model.transcribe(audio_path, word_timestamps=self.word_timestamps and timing is not None, **DECODE_OPTIONS)
+
+        print(f"Detected language '{info.language}' with probability {info.language_probability}")
+
+        def segment_dicts():
+            # Convert faster-whisper's Segment objects to the dict structure we need.
             for segment in segments:
-                segment_list.append({
+                if timing is not None:
+                    timing.add_segment(_word_tuples(segment))
+                yield {
                     "start": segment.start,
                     "end": segment.end,
                     "text": segment.text.strip()
-                })
-            
+                }
             print("Transcription completed.")
-            return segment_list, info.language
+
+        return segment_dicts(), info.language
+
+    def _transcribe_with_speech_map(self, audio_path, timing):
+        """
+        Does what `vad_filter=True` does inside faster-whisper (detect speech, decode only the
+        speech, map the timestamps back), but keeps the speech intervals it finds.
+        """
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE) if isinstance(audio_path, str) else audio_path
+        speech_chunks = get_speech_timestamps(audio, VadOptions())
+        timing.speech = SpeechMap.from_chunks(speech_chunks, SAMPLE_RATE)
+        timing.audio_seconds = len(audio) / SAMPLE_RATE
+        speech_audio = _speech_audio(audio, speech_chunks)
+        print(f"VAD kept {timing.speech.speech_seconds:.1f}s of speech in {len(speech_chunks)} intervals.")
+
+        segments, info = self.model.transcribe(speech_audio, word_timestamps=self.word_timestamps, **SPEECH_DECODE_OPTIONS)
+        if speech_chunks:
+            segments = restore_speech_timestamps(segments, speech_chunks, SAMPLE_RATE)
+        return segments, info
+
+    def _split_on_silence(self, audio, chunk_samples, speech=None):
+        """
+        Splits audio into chunks of roughly `chunk_samples`, cutting only in the middle of
+        silences detected by the VAD so no word is cut in half.
+
+        Args:
+            speech (list, optional): Speech timestamps already computed for `audio`.
+
+        Returns:
+            list: A list of (start_sample, end_sample) tuples covering the whole audio.
+        """
+        if speech is None:
+            speech = get_speech_timestamps(audio, VadOptions())
+        boundaries = [0]
+        for previous, current in zip(speech, speech[1:]):
+            if current["start"] - boundaries[-1] >= chunk_samples:
+                boundaries.append((previous["end"] + current["start"]) // 2)
+        boundaries.append(len(audio))
+        return list(zip(boundaries[:-1], boundaries[1:]))
+
+    def transcribe_audio_parallel(self, audio_path):
+        """
+        Transcribes audio by splitting it at silences and decoding the chunks on a pool
+        of Whisper worker processes.
+
+        The language is detected once on the first chunk and reused for all the others,
+        and the merged segments keep the same shape as `transcribe_audio`. With a single
+        worker this is the same as `transcribe_audio`, and no process pool is started.
+
+        Args:
+            audio_path (str or np.ndarray): An audio file path or a 16 kHz mono float32 waveform.
+
+        Returns:
+            tuple: The list of segment dictionaries and the detected language code.
+        """
+        if self.num_workers <= 1:
+            return self.transcribe_audio(audio_path)
+        try:
+            segments, language = self._stream_segments_parallel(audio_path)
+            return list(segments), language
 
         except Exception as e:
             print(f"An error occurred during transcription: {e}")
-            # Re-raise the exception to be caught by the main app's error handler
             raise e
+
+    def _stream_segments_parallel(self, audio_path, timing=None):
+        """Parallel counterpart of `stream_segments`; chunks are yielded in order as they finish."""
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE) if isinstance(audio_path, str) else audio_path
+        speech = get_speech_timestamps(audio, VadOptions())
+        if timing is not None:
+            timing.speech = SpeechMap.from_chunks(speech, SAMPLE_RATE)
+            timing.audio_seconds = len(audio) / SAMPLE_RATE
+        chunks = self._split_on_silence(audio, int(self.chunk_minutes * 60 * SAMPLE_RATE), speech)
+        print(f"Split audio into {len(chunks)} chunks for {self.num_workers} workers.")
+
+        # The VAD ran once above; each chunk gets its slice of the speech map and only its speech audio
+        chunk_speech = [_speech_in_range(speech, start, end) for start, end in chunks]
+        chunk_audio = [_speech_audio(audio[start:end], intervals) for (start, end), intervals in zip(chunks, chunk_speech)]
+
+        # Language detection runs eagerly in transcribe() on the first chunk with speech;
+        # the segment generator is never consumed
+        first = next((i for i, intervals in enumerate(chunk_speech) if intervals), 0)
+        _, info = self.model.transcribe(chunk_audio[first], **SPEECH_DECODE_OPTIONS)
+        print(f"Detected language '{info.language}' with probability {info.language_probability}")
+
+        if self._pool is None:
+            # 'spawn' keeps the parent's CTranslate2 thread pools out of the workers
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_size, self.cpu_threads_per_worker)
+            )
+
+        futures = [
+            self._pool.submit(_transcribe_chunk, speech_audio, intervals, start / SAMPLE_RATE, info.language, self.word_timestamps and timing is not None)
+            for (start, _), speech_audio, intervals in zip(chunks, chunk_audio, chunk_speech)
+        ]
+
+        def merged_segments():
+            for future in futures:
+                for segment, words in future.result():
+                    if timing is not None:
+                        timing.add_segment(words)
+                    yield segment
+            print("Transcription completed.")
+
+        return merged_segments(), info.language
+
+    def close(self):
+        """Shuts down the worker pool used for parallel transcription, if one was started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,160 @@
+# src/transcript_cache.py
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.transcript_timing import TranscriptTiming
+
+class TranscriptCache:
+    def __init__(self, db_path=os.path.join(".cache", "transcripts.sqlite3"), max_bytes=512 * 1024 * 1024):
+        """
+        A persistent cache of transcription results (segments, detected language and, when
+        captured, the VAD speech map and word timestamps) stored in SQLite.
+
+        Args:
+            db_path (str): Where the SQLite database lives on local disk.
+            max_bytes (int): Once the stored transcripts exceed this size, the least recently
+                             used ones are evicted.
+        """
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            " key TEXT PRIMARY KEY,"
+            " language TEXT NOT NULL,"
+            " segments TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        # Caches created before timing data was stored lack the column
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(transcripts)")}
+        if "timing" not in columns:
+            self._conn.execute("ALTER TABLE transcripts ADD COLUMN timing BLOB")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_transcripts_last_used ON transcripts(last_used)")
+        self._conn.commit()
+        print(f"TranscriptCache initialized at: {db_path}")
+
+    @staticmethod
+    def fingerprint_file(path, block_size=1024 * 1024):
+        """
+        Hashes a file's content with BLAKE2, reading it in blocks so large uploads are never fully in memory.
+
+        Returns:
+            str: The hex digest of the file content.
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def make_key(self, file_fingerprint, apply_noise_reduction, duration_limit, model_size, decode_options):
+        """
+        Builds the cache key for a transcription.
+
+        Args:
+            file_fingerprint (str): The result of `fingerprint_file` for the uploaded file.
+            apply_noise_reduction (bool): Whether noise reduction was applied before transcription.
+            duration_limit (float or None): The number of seconds transcribed, or None for the whole file.
+            model_size (str): The Whisper model size.
+            decode_options (dict): The keyword arguments passed to `WhisperModel.transcribe`.
+
+        Returns:
+            str: A hex digest identifying the transcription.
+        """
+        settings = {
+            "file": file_fingerprint,
+            "noise_reduction": bool(apply_noise_reduction),
+            "duration_limit": duration_limit,
+            "model_size": model_size,
+            "decode_options": decode_options,
+        }
+        return hashlib.blake2b(json.dumps(settings, sort_keys=True).encode("utf-8"), digest_size=20).hexdigest()
+
+    def get(self, key):
+        """
+        Looks up a transcription and refreshes its LRU timestamp.
+
+        Returns:
+            tuple or None: (segments, language) if the key is cached, otherwise None.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT segments, language FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def get_timing(self, key):
+        """
+        Looks up the timing data stored with a transcription.
+
+        Returns:
+            TranscriptTiming or None: None if the key is not cached or was stored without timing.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT timing FROM transcripts WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return TranscriptTiming.from_bytes(row[0])
+
+    def put(self, key, segments, language, timing=None):
+        """
+        Stores a transcription and evicts the least recently used ones beyond `max_bytes`.
+
+        Args:
+            timing (TranscriptTiming, optional): Speech map and word timestamps to keep with it.
+        """
+        payload = json.dumps(segments, ensure_ascii=False)
+        timing_payload = timing.to_bytes() if timing is not None else None
+        size = len(payload.encode("utf-8")) + len(timing_payload or b"")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, language, segments, timing, size, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, language, payload, timing_payload, size, time.time())
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute("SELECT key, size FROM transcripts ORDER BY last_used ASC").fetchall()
+                evict = []
+                for old_key, old_size in rows:
+                    if total <= self.max_bytes or old_key == key:
+                        break
+                    evict.append((old_key,))
+                    total -= old_size
+                self._conn.executemany("DELETE FROM transcripts WHERE key = ?", evict)
+            self._conn.commit()
+
+    def stats(self):
+        """Returns the hit/miss counters and the current number and size of stored transcripts."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
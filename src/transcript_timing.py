@@ -0,0 +1,208 @@
+# src/transcript_timing.py
+
+import io
+from array import array
+
+import numpy as np
+
+class SpeechMap:
+    __slots__ = ("intervals", "sample_rate")
+
+    def __init__(self, intervals, sample_rate=16000):
+        """
+        The speech intervals found by the VAD, kept so later stages never run it again.
+
+        Args:
+            intervals (np.ndarray): An (n, 2) int64 array of [start, end) sample offsets, in order.
+            sample_rate (int): The sample rate the offsets refer to.
+        """
+        self.intervals = np.asarray(intervals, dtype=np.int64).reshape(-1, 2)
+        self.sample_rate = sample_rate
+
+    @classmethod
+    def from_chunks(cls, chunks, sample_rate=16000):
+        """Builds the map from faster-whisper's [{'start': ..., 'end': ...}] speech timestamps."""
+        return cls([(chunk["start"], chunk["end"]) for chunk in chunks], sample_rate)
+
+    def to_chunks(self):
+        """The inverse of `from_chunks`, for faster-whisper's VAD helpers."""
+        return [{"start": int(start), "end": int(end)} for start, end in self.intervals]
+
+    @property
+    def seconds(self):
+        """The intervals as an (n, 2) float array of seconds."""
+        return self.intervals / self.sample_rate
+
+    @property
+    def speech_seconds(self):
+        return float((self.intervals[:, 1] - self.intervals[:, 0]).sum()) / self.sample_rate
+
+    def is_speech(self, seconds):
+        """Whether the given time (or array of times) falls inside a speech interval."""
+        samples = np.asarray(seconds) * self.sample_rate
+        if not len(self.intervals):
+            # Silent or music-only audio: the VAD found no speech at all
+            inside = np.zeros(samples.shape, dtype=bool)
+            return inside if inside.ndim else False
+        idx = np.searchsorted(self.intervals[:, 0], samples, side="right") - 1
+        inside = (idx >= 0) & (samples < self.intervals[np.maximum(idx, 0), 1])
+        return inside if inside.ndim else bool(inside)
+
+    def __len__(self):
+        return len(self.intervals)
+
+class WordTimings:
+    __slots__ = ("starts", "ends", "probabilities", "segment_ids", "text", "offsets")
+
+    def __init__(self, starts, ends, probabilities, segment_ids, text, offsets):
+        """
+        Word-level timestamps for a whole transcript, stored column-wise.
+
+        An hour of speech has tens of thousands of words; as NumPy columns plus one
+        string they take a few hundred kilobytes instead of one dict per word.
+
+        Args:
+            starts, ends (np.ndarray): float32 word times in seconds.
+            probabilities (np.ndarray): float32 word probabilities.
+            segment_ids (np.ndarray): int32 index of the segment each word belongs to (non-decreasing).
+            text (str): All words concatenated, including their leading spaces.
+            offsets (np.ndarray): int64 positions of word i in `text` as offsets[i]:offsets[i + 1].
+        """
+        self.starts = starts
+        self.ends = ends
+        self.probabilities = probabilities
+        self.segment_ids = segment_ids
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.starts)
+
+    def word(self, i):
+        return self.text[self.offsets[i]:self.offsets[i + 1]]
+
+    def segment_range(self, segment_id):
+        """Returns the slice of word indices belonging to one segment."""
+        lo, hi = np.searchsorted(self.segment_ids, [segment_id, segment_id + 1])
+        return slice(int(lo), int(hi))
+
+    def words_in_segment(self, segment_id):
+        """Returns (word, start, end) tuples for one segment, e.g. for karaoke-style cues."""
+        span = self.segment_range(segment_id)
+        return [
+            (self.word(i).strip(), round(float(self.starts[i]), 3), round(float(self.ends[i]), 3))
+            for i in range(span.start, span.stop)
+        ]
+
+class TranscriptTiming:
+    def __init__(self):
+        """
+        Collects the VAD speech map and word timestamps while a transcript is decoded.
+
+        Pass an instance to `Transcriber.stream_segments`; the speech map is set before
+        the first segment is yielded and words are appended with each segment. Words
+        accumulate in compact typed arrays, never as per-word objects.
+        """
+        self.speech = None
+        self.audio_seconds = None
+        self.segments = 0
+        self._starts = array('f')
+        self._ends = array('f')
+        self._probabilities = array('f')
+        self._segment_ids = array('i')
+        self._offsets = array('q', [0])
+        self._text = io.StringIO()
+        self._words = None
+
+    def add_segment(self, words):
+        """
+        Records the words of the next segment.
+
+        Args:
+            words (iterable): (word, start, end, probability) tuples; empty when word
+                timestamps are off.
+        """
+        segment_id = self.segments
+        self.segments += 1
+        for word, start, end, probability in words:
+            self._starts.append(start)
+            self._ends.append(end)
+            self._probabilities.append(probability)
+            self._segment_ids.append(segment_id)
+            self._text.write(word)
+            self._offsets.append(self._offsets[-1] + len(word))
+        self._words = None
+
+    @property
+    def words(self):
+        """The collected words as a `WordTimings` (built on first access after a change)."""
+        if self._words is None:
+            self._words = WordTimings(
+                np.array(self._starts, dtype=np.float32),
+                np.array(self._ends, dtype=np.float32),
+                np.array(self._probabilities, dtype=np.float32),
+                np.array(self._segment_ids, dtype=np.int32),
+                self._text.getvalue(),
+                np.array(self._offsets, dtype=np.int64),
+            )
+        return self._words
+
+    def stats(self, duration=None):
+        """
+        Summarizes the timing data.
+
+        Args:
+            duration (float, optional): Audio length in seconds, for the speech ratio.
+                Defaults to the length recorded during transcription.
+
+        Returns:
+            dict: Speech seconds and ratio, word count, and speaking rate in words per speech minute.
+        """
+        duration = duration or self.audio_seconds
+        stats = {"words": len(self._starts)}
+        if self.speech is not None:
+            stats["speech_seconds"] = self.speech.speech_seconds
+            if duration:
+                stats["speech_ratio"] = self.speech.speech_seconds / duration
+            if stats["speech_seconds"] > 0 and stats["words"]:
+                stats["words_per_minute"] = stats["words"] / (stats["speech_seconds"] / 60)
+        return stats
+
+    def to_bytes(self):
+        """Serializes the timing data (e.g. for the transcript cache) as a compressed .npz payload."""
+        words = self.words
+        columns = {
+            "starts": words.starts, "ends": words.ends, "probabilities": words.probabilities,
+            "segment_ids": words.segment_ids, "offsets": words.offsets,
+            "text": np.frombuffer(words.text.encode("utf-32-le"), dtype=np.uint32),
+            "segments": np.array([self.segments], dtype=np.int64),
+        }
+        if self.audio_seconds is not None:
+            columns["audio_seconds"] = np.array([self.audio_seconds], dtype=np.float64)
+        if self.speech is not None:
+            columns["speech"] = self.speech.intervals
+            columns["sample_rate"] = np.array([self.speech.sample_rate], dtype=np.int64)
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **columns)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload):
+        with np.load(io.BytesIO(payload)) as data:
+            timing = cls()
+            timing.segments = int(data["segments"][0])
+            timing._starts = array('f', data["starts"].tobytes())
+            timing._ends = array('f', data["ends"].tobytes())
+            timing._probabilities = array('f', data["probabilities"].tobytes())
+            timing._segment_ids = array('i', data["segment_ids"].tobytes())
+            timing._offsets = array('q', data["offsets"].tobytes())
+            timing._text.write(data["text"].tobytes().decode("utf-32-le"))
+            if "speech" in data:
+                timing.speech = SpeechMap(data["speech"], int(data["sample_rate"][0]))
+            if "audio_seconds" in data:
+                timing.audio_seconds = float(data["audio_seconds"][0])
+            elif timing.speech is not None and len(timing.speech):
+                # Payloads cached before the length was stored: the end of the last speech
+                # interval is a lower bound, so the speech ratio can't exceed 100%
+                timing.audio_seconds = float(timing.speech.seconds[-1, 1])
+        return timing
@@ -0,0 +1,142 @@
+# src/translation_backends.py
+
+import os
+
+# mBART-50's generation config decodes with 5 beams and at most 200 tokens
+DEFAULT_BEAM_SIZE = 5
+MAX_OUTPUT_TOKENS = 200
+
+class TorchBackend:
+    def __init__(self, model_name, tokenizer, num_threads=None, quantize=False, beam_size=None):
+        """
+        Runs mBART with PyTorch, optionally with dynamic int8 quantization of its Linear layers.
+
+        Args:
+            model_name (str): The Hugging Face model to load.
+            tokenizer: The mBART-50 tokenizer shared with the Translator.
+            num_threads (int, optional): Size of torch's intra-op thread pool (process-wide).
+            quantize (bool): Quantize the Linear layers to int8 (CPU only).
+            beam_size (int, optional): Beams per segment; 1 is greedy. Defaults to the model's config.
+        """
+        # torch/transformers are heavy to import, so they are only loaded when a backend is built
+        import torch
+        from transformers import MBartForConditionalGeneration
+        from transformers.modeling_outputs import BaseModelOutput
+
+        self._torch = torch
+        self._base_model_output = BaseModelOutput
+        self.tokenizer = tokenizer
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.device = "cpu" if quantize or not torch.cuda.is_available() else "cuda"
+
+        self.model = MBartForConditionalGeneration.from_pretrained(model_name).to(self.device)
+        self.model.eval()
+        if quantize:
+            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        self._generate_options = {"num_beams": beam_size} if beam_size else {}
+        # Everything besides the model name and beams that changes the output, for translation cache keys
+        self.cache_signature = f"torch|{'int8' if quantize else 'fp32'}"
+
+    def translate_batch(self, texts, targets):
+        """
+        Translates one batch into several languages, encoding it only once.
+
+        Args:
+            texts (list): Source texts of the batch (already term-protected).
+            targets (dict): mBART target code -> list of row indices into `texts` to decode.
+
+        Returns:
+            tuple: mBART target code -> decoded texts (in row order), and the generated token count.
+        """
+        torch = self._torch
+        encoded_batch = self.tokenizer(texts, return_tensors="pt", padding=True).to(self.device)
+
+        translations = {}
+        output_tokens = 0
+        with torch.no_grad():
+            encoder_outputs = self.model.get_encoder()(**encoded_batch)
+            for target, rows in targets.items():
+                row_index = torch.tensor(rows, device=self.device)
+                # generate() expands encoder outputs in place for beam search, so each
+                # target gets its own BaseModelOutput around the shared hidden states
+                generated_tokens = self.model.generate(
+                    encoder_outputs=self._base_model_output(
+                        last_hidden_state=encoder_outputs.last_hidden_state.index_select(0, row_index)
+                    ),
+                    attention_mask=encoded_batch["attention_mask"].index_select(0, row_index),
+                    forced_bos_token_id=self.tokenizer.lang_code_to_id[target],
+                    **self._generate_options
+                )
+                output_tokens += int((generated_tokens != self.tokenizer.pad_token_id).sum())
+                translations[target] = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)
+        return translations, output_tokens
+
+class CTranslate2Backend:
+    def __init__(self, model_name, tokenizer, num_threads=None, beam_size=None, compute_type="int8", model_dir=None):
+        """
+        Runs mBART with CTranslate2, the same int8 inference engine faster-whisper uses.
+
+        The Hugging Face checkpoint is converted once (this step needs torch) and the
+        converted model is reused from `model_dir` afterwards.
+
+        Args:
+            model_name (str): The Hugging Face model to convert.
+            tokenizer: The mBART-50 tokenizer shared with the Translator.
+            num_threads (int, optional): CTranslate2 intra-op threads.
+            beam_size (int, optional): Beams per segment; 1 is greedy. Defaults to mBART-50's 5.
+            compute_type (str): Weight type, e.g. "int8", "int8_float32" or "float32".
+            model_dir (str, optional): Where the converted model lives.
+        """
+        import ctranslate2
+
+        self.tokenizer = tokenizer
+        self.beam_size = beam_size or DEFAULT_BEAM_SIZE
+        self.device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        if model_dir is None:
+            model_dir = os.path.join(".cache", "ct2", model_name.replace("/", "--") + f"-{compute_type}")
+
+        if not os.path.exists(os.path.join(model_dir, "model.bin")):
+            print(f"Converting {model_name} to CTranslate2 ({compute_type}) in: {model_dir}")
+            from ctranslate2.converters import TransformersConverter
+            TransformersConverter(model_name).convert(model_dir, quantization=compute_type, force=True)
+
+        self.translator = ctranslate2.Translator(
+            model_dir, device=self.device, compute_type=compute_type, intra_threads=num_threads or 0
+        )
+        # A different weight type or converted model gives different output, so both key the cache
+        self.cache_signature = f"ctranslate2|{compute_type}|{os.path.abspath(model_dir)}"
+
+    def translate_batch(self, texts, targets):
+        """Same contract as `TorchBackend.translate_batch`; all targets go through one call."""
+        source_tokens = [self.tokenizer.convert_ids_to_tokens(ids) for ids in self.tokenizer(texts)["input_ids"]]
+
+        # The target language is forced through the decoder prefix, one entry per (row, target)
+        sources, prefixes, owners = [], [], []
+        for target, rows in targets.items():
+            for row in rows:
+                sources.append(source_tokens[row])
+                prefixes.append([target])
+                owners.append(target)
+
+        results = self.translator.translate_batch(
+            sources, target_prefix=prefixes, beam_size=self.beam_size, max_decoding_length=MAX_OUTPUT_TOKENS
+        )
+
+        translations = {target: [] for target in targets}
+        output_tokens = 0
+        for target, result in zip(owners, results):
+            # Drop the forced language token
+            hypothesis = result.hypotheses[0][1:]
+            output_tokens += len(hypothesis)
+            translations[target].append(
+                self.tokenizer.decode(self.tokenizer.convert_tokens_to_ids(hypothesis), skip_special_tokens=True)
+            )
+        return translations, output_tokens
+
+# Selectable by name, e.g. from app.py's TRANSLATOR_BACKEND setting
+TRANSLATOR_BACKENDS = {
+    "torch": lambda model_name, tokenizer, **options: TorchBackend(model_name, tokenizer, **options),
+    "torch-int8": lambda model_name, tokenizer, **options: TorchBackend(model_name, tokenizer, quantize=True, **options),
+    "ctranslate2": lambda model_name, tokenizer, **options: CTranslate2Backend(model_name, tokenizer, **options),
+}
@@ -0,0 +1,132 @@
+# src/translation_cache.py
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+class TranslationCache:
+    def __init__(self, db_path=os.path.join(".cache", "translations.sqlite3"), max_entries=200000):
+        """
+        A persistent, content-addressed cache of segment translations stored in SQLite.
+
+        Args:
+            db_path (str): Where the SQLite database lives on local disk.
+            max_entries (int): Once exceeded, the least recently used entries are evicted.
+        """
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # Gradio runs handlers on worker threads, so the connection is shared behind a lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " translation TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON translations(last_used)")
+        self._conn.commit()
+        print(f"TranslationCache initialized at: {db_path}")
+
+    @staticmethod
+    def normalize_text(text):
+        """Collapses whitespace so trivially different copies of a segment share a key."""
+        return " ".join(text.split())
+
+    def make_key(self, text, src_lang, target_lang, preserve_technical_terms, model_name, variant=""):
+        """
+        Builds the cache key for a single segment.
+
+        Args:
+            text (str): The original (unprotected) segment text.
+            src_lang (str): The mBART source language code (e.g., 'en_XX').
+            target_lang (str): The mBART target language code (e.g., 'es_XX').
+            preserve_technical_terms (bool): Whether term protection was applied.
+            model_name (str): The translation model that produced the output.
+            variant (str): Any other setting that changes the output (e.g. the term-protection glossary).
+
+        Returns:
+            str: A hex digest identifying the translation.
+        """
+        parts = [self.normalize_text(text), src_lang, target_lang, "1" if preserve_technical_terms else "0", model_name, variant]
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=20).hexdigest()
+
+    def get_many(self, keys):
+        """
+        Looks up several keys at once and refreshes their LRU timestamps.
+
+        Returns:
+            dict: A mapping of the keys that were found to their cached translations.
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters, so query in chunks
+            for i in range(0, len(unique_keys), 500):
+                chunk = unique_keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, translation FROM translations WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def put_many(self, items):
+        """
+        Stores translations and evicts the least recently used entries beyond `max_entries`.
+
+        Args:
+            items (dict): A mapping of cache keys to translated text.
+        """
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO translations (key, translation, last_used) VALUES (?, ?, ?)",
+                [(key, translation, now) for key, translation in items.items()]
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM translations WHERE key IN ("
+                    " SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def stats(self):
+        """Returns the hit/miss counters and the current number of stored entries."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,118 +1,256 @@
 # src/translator.py
 
-from transformers import MBartForConditionalGeneration, MBart50TokenizerFast
-import torch
-import re
+from src.term_protection import TermProtector
+from src.translation_cache import TranslationCache
+from src.translation_backends import TRANSLATOR_BACKENDS
+
+# mBART requires specific language codes
+MBART_LANG_CODES = {
+    'en': 'en_XX', 'es': 'es_XX', 'fr': 'fr_XX', 'de': 'de_DE', 'zh': 'zh_CN',
+    'ru': 'ru_RU', 'ja': 'ja_XX', 'ar': 'ar_AR', 'hi': 'hi_IN', 'ko': 'ko_KR',
+    'pt': 'pt_XX', 'ta': 'ta_IN', 'uk': 'uk_UA', 'vi': 'vi_VN'
+}
 
 class Translator:
-    def __init__(self, model_name="facebook/mbart-large-50-many-to-many-mmt"):
+    def __init__(self, model_name="facebook/mbart-large-50-many-to-many-mmt", batch_size=8, max_batch_tokens=2048, cache=None, num_threads=None, glossary=None, backend="torch", beam_size=None, backend_options=None):
         """
         Initializes the Translator with the mBART-50 model.
+
+        Args:
+            model_name (str): The Hugging Face model to load.
+            batch_size (int): Maximum number of segments translated per backend call.
+            max_batch_tokens (int): Maximum padded tokens (longest segment x batch size) per call.
+            cache (TranslationCache, optional): Persistent cache of previous translations.
+            num_threads (int, optional): Size of the inference engine's intra-op thread pool.
+                For torch this setting is process-wide, so it caps every torch model in the process.
+            glossary (iterable, optional): Extra domain terms to keep untranslated when
+                technical terms are preserved.
+            backend (str): The inference engine, one of TRANSLATOR_BACKENDS: "torch" (fp32),
+                "torch-int8" (dynamically quantized) or "ctranslate2".
+            beam_size (int, optional): Beams per segment; 1 is greedy. Defaults to the model's 5.
+            backend_options (dict, optional): Extra backend arguments, e.g. `compute_type`
+                and `model_dir` for "ctranslate2".
         """
-        # Determine device
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        print(f"Initializing Translator on device: {self.device}")
+        if backend not in TRANSLATOR_BACKENDS:
+            raise ValueError(f"Unknown translator backend '{backend}'. Choose from: {', '.join(TRANSLATOR_BACKENDS)}")
 
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.cache = cache
+        self.term_protector = TermProtector(glossary)
+        self.backend_name = backend
+        self.beam_size = beam_size
+
+        # transformers is heavy to import, so it is only loaded when a Translator is built
+        from transformers import MBart50TokenizerFast
+
+        print(f"Initializing Translator with the '{backend}' backend")
         try:
-            self.model = MBartForConditionalGeneration.from_pretrained(model_name).to(self.device)
             self.tokenizer = MBart50TokenizerFast.from_pretrained(model_name)
-            print("Translator model and tokenizer loaded successfully.")
+            self.backend = TRANSLATOR_BACKENDS[backend](
+                model_name, self.tokenizer, num_threads=num_threads, beam_size=beam_size, **(backend_options or {})
+            )
+            self.device = self.backend.device
+            print(f"Translator model and tokenizer loaded successfully on device: {self.device}")
         except Exception as e:
             print(f"Error loading translation model/tokenizer: {e}")
             raise
 
-    def _protect_technical_terms(self, text):
+    @staticmethod
+    def _make_batches(token_lengths, batch_size, max_batch_tokens):
         """
-        Finds technical-looking terms (all-caps, camelCase with numbers) and replaces them
-        with placeholders.
-        
+        Groups segment indices into length-sorted batches.
+
+        Sorting by token length keeps similarly sized segments together so each
+        padded batch wastes as little compute as possible. A batch is closed when it
+        reaches `batch_size` segments or when its padded size (longest segment times
+        number of segments) would exceed `max_batch_tokens`.
+
         Returns:
-            tuple: The processed text and a dictionary mapping placeholders to original terms.
+            list: A list of batches, each a list of indices into the original segments.
+        """
+        order = sorted(range(len(token_lengths)), key=lambda i: token_lengths[i])
+        batches = []
+        current = []
+        longest = 0
+        for idx in order:
+            length = token_lengths[idx]
+            padded_size = max(longest, length) * (len(current) + 1)
+            if current and (len(current) >= batch_size or padded_size > max_batch_tokens):
+                batches.append(current)
+                current, longest = [], 0
+            current.append(idx)
+            longest = max(longest, length)
+        if current:
+            batches.append(current)
+        return batches
+
+    def _translate_pending(self, segments, pending, translated_texts, preserve_technical_terms, batch_size, max_batch_tokens):
         """
-        # Regex to find all-caps words (like GAN, CNN), mixed-case with numbers (PyTorch1.0), etc.
-        # This is a simple heuristic and can be improved.
-        pattern = re.compile(r'\b([A-Z]{2,}|[A-Za-z]*[0-9]+[A-Za-z]*)\b')
-        protections = {}
-        count = 0
-
-        def replace_func(match):
-            nonlocal count
-            term = match.group(0)
-            placeholder = f"__TERM{count}__"
-            protections[placeholder] = term
-            count += 1
-            return placeholder
-
-        processed_text = pattern.sub(replace_func, text)
-        return processed_text, protections
-
-    def _unprotect_technical_terms(self, text, protections):
-        """Replaces placeholders with their original technical terms."""
-        for placeholder, original in protections.items():
-            text = text.replace(placeholder, original)
-        return text
-
-    def translate_segments(self, segments, src_lang, target_lang, preserve_technical_terms):
+        Runs the model over every segment that still lacks a translation in at least one
+        target language and writes the results into `translated_texts[target][idx]`.
+
+        Each batch is handed to the backend once with every target language that needs
+        it, so the source is tokenized (and, for torch, encoded) only once. Segments with
+        the same (normalized) text, such as a repeated intro, are translated once and the
+        result is shared between them.
+
+        Args:
+            pending (dict): mBART target code -> set of segment indices to translate.
+            translated_texts (dict): mBART target code -> list of texts, filled in place.
+
+        Returns:
+            tuple: The number of input tokens and of generated (non-padding) tokens.
+        """
+        # Normalized text -> the pending segment indices that carry it
+        groups = {}
+        for idx in sorted(set().union(*pending.values())):
+            groups.setdefault(TranslationCache.normalize_text(segments[idx]['text']), []).append(idx)
+        union = list(groups.values())
+        texts_to_translate = [segments[indices[0]]['text'] for indices in union]
+        all_protections = None
+        if preserve_technical_terms:
+            texts_to_translate, all_protections = self.term_protector.protect_batch(texts_to_translate)
+
+        # Token lengths drive the sorting and the padding budget of each batch
+        token_lengths = [len(ids) for ids in self.tokenizer(texts_to_translate)["input_ids"]]
+        batches = self._make_batches(token_lengths, batch_size, max_batch_tokens)
+
+        done = 0
+        output_tokens = 0
+        for batch in batches:
+            rows_by_target = {}
+            for target, target_pending in pending.items():
+                rows = [row for row, pos in enumerate(batch) if not target_pending.isdisjoint(union[pos])]
+                if rows:
+                    rows_by_target[target] = rows
+
+            translations, batch_output_tokens = self.backend.translate_batch(
+                [texts_to_translate[pos] for pos in batch], rows_by_target
+            )
+            output_tokens += batch_output_tokens
+
+            for target, rows in rows_by_target.items():
+                decoded = translations[target]
+                if preserve_technical_terms:
+                    decoded = self.term_protector.restore_batch(decoded, [all_protections[batch[row]] for row in rows])
+                for row, translated_text in zip(rows, decoded):
+                    for idx in union[batch[row]]:
+                        translated_texts[target][idx] = translated_text
+
+            done += len(batch)
+            print(f"Translated {done}/{len(union)} unique segments into {len(pending)} language(s)...")
+
+        return sum(token_lengths), output_tokens
+
+    def translate_segments(self, segments, src_lang, target_lang, preserve_technical_terms, batch_size=None, max_batch_tokens=None, metrics=None):
         """
         Translates a list of text segments from a source language to a target language.
 
+        Segments are translated in padded, length-sorted batches and the results are
+        returned in the original segment order. When a cache is configured, only
+        segments missing from it are sent to the model.
+
         Args:
             segments (list): A list of dictionaries with a 'text' key.
             src_lang (str): The source language code (e.g., 'en_XX').
             target_lang (str): The target language code (e.g., 'es_XX').
             preserve_technical_terms (bool): Whether to protect technical terms from translation.
+            batch_size (int, optional): Maximum segments per batch. Defaults to the value given at init.
+            max_batch_tokens (int, optional): Maximum padded tokens per batch. Defaults to the value given at init.
+            metrics (StageRecord, optional): Receives segment, cache-hit and token counts for throughput reporting.
 
         Returns:
             list: The list of segments with the 'text' key now containing translated text.
         """
-        # mBART requires specific language codes
-        lang_code_map = {
-            'en': 'en_XX', 'es': 'es_XX', 'fr': 'fr_XX', 'de': 'de_DE', 'zh': 'zh_CN',
-            'ru': 'ru_RU', 'ja': 'ja_XX', 'ar': 'ar_AR', 'hi': 'hi_IN', 'ko': 'ko_KR',
-            'pt': 'pt_XX', 'ta': 'ta_IN', 'uk': 'uk_UA', 'vi': 'vi_VN'
-        }
-        
+        return self.translate_segments_multi(
+            segments, src_lang, [target_lang], preserve_technical_terms, batch_size, max_batch_tokens, metrics
+        )[target_lang]
+
+    def translate_segments_multi(self, segments, src_lang, target_langs, preserve_technical_terms, batch_size=None, max_batch_tokens=None, metrics=None):
+        """
+        Translates segments into several target languages at once.
+
+        Tokenization, term protection and the encoder pass happen once per batch; only
+        decoding is repeated per language. This is considerably cheaper than calling
+        `translate_segments` once per language.
+
+        Args:
+            target_langs (list): Target language codes (e.g., ['es', 'fr', 'de']).
+            Other arguments are as for `translate_segments`.
+
+        Returns:
+            dict: One list of translated segments per target language, keyed as given.
+        """
+        target_langs = list(dict.fromkeys(target_langs))
+        if not segments:
+            return {target_lang: [] for target_lang in target_langs}
+
+        batch_size = batch_size or self.batch_size
+        max_batch_tokens = max_batch_tokens or self.max_batch_tokens
+
         # Fallback to the code itself if not in our simple map
-        mbart_src_lang = lang_code_map.get(src_lang, src_lang)
-        mbart_target_lang = lang_code_map.get(target_lang, target_lang)
-        
-        print(f"Translating from {mbart_src_lang} to {mbart_target_lang}...")
-
-        translated_segments = []
-        for i, segment in enumerate(segments):
-            text_to_translate = segment['text']
-            protections = {}
-            
-            if preserve_technical_terms:
-                text_to_translate, protections = self._protect_technical_terms(text_to_translate)
-            
-            # Set the source language for the tokenizer
-            self.tokenizer.src_lang = mbart_src_lang
-            
-            # Encode the text
-            encoded_text = self.tokenizer(text_to_translate, return_tensors="pt").to(self.device)
-            
-            # Generate translation, force the output to be the target language
-            generated_tokens = self.model.generate(
-                **encoded_text,
-                forced_bos_token_id=self.tokenizer.lang_code_to_id[mbart_target_lang]
-            )
-            
-            # Decode the translated text
-            translated_text = self.tokenizer.batch_decode(generated_tokens, skip_special_tokens=True)[0]
+        mbart_src_lang = MBART_LANG_CODES.get(src_lang, src_lang)
+        mbart_targets = {target_lang: MBART_LANG_CODES.get(target_lang, target_lang) for target_lang in target_langs}
+
+        print(f"Translating from {mbart_src_lang} to {', '.join(mbart_targets.values())}...")
+
+        # Set the source language for the tokenizer once for the whole job
+        self.tokenizer.src_lang = mbart_src_lang
+
+        translated_texts = {target: [None] * len(segments) for target in mbart_targets.values()}
 
+        # Only segments that are not already in the persistent cache reach the model
+        cache_keys = None
+        if self.cache is not None:
+            # The backend (engine, weight type, converted model), beam size, glossary and
+            # placeholder scheme all change the output, so they are part of the key
+            variant = f"{self.backend.cache_signature}|beams:{self.beam_size or 'default'}"
             if preserve_technical_terms:
-                translated_text = self._unprotect_technical_terms(translated_text, protections)
-                
-            # Keep original start/end times, just update the text
-            translated_segments.append({
-                "start": segment['start'],
-                "end": segment['end'],
-                "text": translated_text
-            })
-            
-            if (i + 1) % 10 == 0:
-                print(f"Translated {i + 1}/{len(segments)} segments...")
+                variant += f"|terms:{self.term_protector.signature}"
+            cache_keys = {
+                target: [
+                    self.cache.make_key(segment['text'], mbart_src_lang, target, preserve_technical_terms, self.model_name, variant=variant)
+                    for segment in segments
+                ]
+                for target in translated_texts
+            }
+            cached = self.cache.get_many([key for keys in cache_keys.values() for key in keys])
+            for target, keys in cache_keys.items():
+                for idx, key in enumerate(keys):
+                    if key in cached:
+                        translated_texts[target][idx] = cached[key]
+            found = sum(text is not None for texts in translated_texts.values() for text in texts)
+            print(f"Translation cache: {found}/{len(segments) * len(translated_texts)} segment translations found.")
+
+        pending = {
+            target: {idx for idx, text in enumerate(texts) if text is None}
+            for target, texts in translated_texts.items()
+        }
+        pending = {target: indices for target, indices in pending.items() if indices}
+        input_tokens = output_tokens = 0
+        if pending:
+            input_tokens, output_tokens = self._translate_pending(segments, pending, translated_texts, preserve_technical_terms, batch_size, max_batch_tokens)
+            if self.cache is not None:
+                self.cache.put_many({
+                    cache_keys[target][idx]: translated_texts[target][idx]
+                    for target, indices in pending.items() for idx in indices
+                })
+
+        # Keep original start/end times, just update the text
+        results = {
+            target_lang: [
+                {"start": segment['start'], "end": segment['end'], "text": text}
+                for segment, text in zip(segments, translated_texts[mbart_target])
+            ]
+            for target_lang, mbart_target in mbart_targets.items()
+        }
+
+        if metrics is not None:
+            translations = len(segments) * len(translated_texts)
+            cache_hits = translations - sum(len(indices) for indices in pending.values())
+            metrics.add(segments=len(segments), translations=translations, cache_hits=cache_hits, input_tokens=input_tokens, output_tokens=output_tokens)
 
         print("Translation complete.")
-        return translated_segments
+        return results